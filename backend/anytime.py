@@ -0,0 +1,267 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from presolve import prune_riders
+from solver import SolverRequest, build_model, build_solution, solve_relaxation
+from solve_cache import request_key
+
+# LP relaxation values per request key (see lp_bound)
+_LP_BOUNDS = OrderedDict()
+_LP_BOUNDS_LOCK = threading.Lock()
+MAX_LP_BOUNDS = 256
+
+class _Instance:
+    """
+    Dense view of a request: points[r, c] and price[r], with rider r = ids[r] and race c =
+    race_ids[c]. Riders without points are only needed to fill the squad, so just the cheapest
+    team_size of them are kept (prune_riders is too slow for the deadline on large pools).
+    """
+    def __init__(self, req: SolverRequest):
+        race_ids = {c.id for c in req.races}
+        by_id = {r.id: r for r in req.riders}
+        scoring, blank = [], []
+        for r in req.riders:
+            if any(p > 0 and c in race_ids for c, p in r.expected_points.items()):
+                scoring.append(r.id)
+            else:
+                blank.append(r)
+        blank.sort(key=lambda r: r.price)
+        self.ids = scoring + [r.id for r in blank[:req.team_size]]
+        self.race_ids = [c.id for c in req.races]
+        self.points = np.array(
+            [[by_id[m].expected_points.get(c, 0.0) for c in self.race_ids] for m in self.ids], dtype=float
+        ).reshape(len(self.ids), len(self.race_ids))
+        self.price = np.array([by_id[m].price for m in self.ids], dtype=float)
+        self.budget = float(req.budget)
+        self.team_size = req.team_size
+        self.size = req.race_squad_size
+        self.max_transfers = req.max_transfers
+
+    def thresholds(self, M):
+        """k-th and (k+1)-th best points of squad matrix M (squad members on axis 0), 0 if missing."""
+        S = -np.sort(-M, axis=0)
+        kth = S[self.size - 1] if len(S) >= self.size else np.zeros(S.shape[1:])
+        next_kth = S[self.size] if len(S) > self.size else np.zeros(S.shape[1:])
+        return kth, next_kth
+
+    def score(self, squads):
+        """Season points of per-race squads (races x team_size rider indices) with their best lineups."""
+        M = self.points[squads, np.arange(len(squads))[:, None]]
+        return float(-np.sort(-M, axis=1)[:, :self.size].sum())
+
+def _fill(inst, squad, rng, noise):
+    """
+    Completes a partial squad greedily by marginal points per price (randomised by `noise`),
+    never spending what is needed to fill the remaining slots with the cheapest riders.
+    """
+    squad = list(squad)
+    pool = np.ones(len(inst.ids), dtype=bool)
+    pool[squad] = False
+    spent = inst.price[squad].sum()
+    while len(squad) < inst.team_size:
+        slots_left = inst.team_size - len(squad) - 1
+        cheapest = np.sort(inst.price[pool])
+        if slots_left:
+            prefix = np.cumsum(cheapest)
+            fill_cost = np.where(inst.price <= cheapest[slots_left - 1], prefix[slots_left] - inst.price, prefix[slots_left - 1])
+        else:
+            fill_cost = 0.0
+        feasible = pool & (spent + inst.price + fill_cost <= inst.budget)
+        if not feasible.any():
+            return None
+        thr = inst.thresholds(inst.points[squad])[0] if len(squad) >= inst.size else 0.0
+        gain = np.maximum(0.0, inst.points - thr).sum(axis=1)
+        key = gain / np.maximum(inst.price, 1e-9) - 1e-9 * inst.price
+        if noise:
+            key = key * rng.lognormal(0.0, noise, len(key))
+        r = int(np.argmax(np.where(feasible, key, -np.inf)))
+        squad.append(r)
+        pool[r] = False
+        spent += inst.price[r]
+    return np.array(squad)
+
+def _improve(inst, squad, deadline):
+    """Best-improvement swaps of the initial squad (no transfer is used before race 0)."""
+    squad = squad.copy()
+    while time.perf_counter() < deadline:
+        M = inst.points[squad]
+        kth, next_kth = inst.thresholds(M)
+        # Per squad member: threshold a newcomer has to beat and points lost when it leaves
+        starter = M >= kth
+        thr = np.where(starter, next_kth, kth)
+        loss = np.where(starter, M - next_kth, 0.0).sum(axis=1)
+        gain = np.maximum(0.0, inst.points[None, :, :] - thr[:, None, :]).sum(axis=2) - loss[:, None]
+        outside = np.ones(len(inst.ids), dtype=bool)
+        outside[squad] = False
+        slack = inst.budget - inst.price[squad].sum()
+        ok = outside[None, :] & (inst.price[None, :] - inst.price[squad][:, None] <= slack)
+        gain = np.where(ok, gain, -np.inf)
+        slot, n = np.unravel_index(np.argmax(gain), gain.shape)
+        if gain[slot, n] <= 1e-9:
+            break
+        squad[slot] = n
+    return squad
+
+def _plan_transfers(inst, squad, deadline):
+    """
+    Season plan from an initial squad: repeatedly makes the single transfer (out, in, race) with
+    the best gain over the remaining races that keeps every later race within budget after fees.
+    """
+    N = len(inst.race_ids)
+    squads = np.tile(squad, (N, 1))
+    transfers = []
+    races = np.arange(N)
+    while len(transfers) < inst.max_transfers and N > 1 and time.perf_counter() < deadline:
+        made = np.array([sum(1 for t in transfers if t[0] <= j) for j in range(N)])
+        M = inst.points[squads, races[:, None]]
+        kth, next_kth = inst.thresholds(M.T)
+        # Budget left at every race once one more transfer (and its fee) is made before it
+        slack = inst.budget - inst.price[squads].sum(axis=1) - np.maximum(0, made + 1 - 3)
+        slack_after = np.minimum.accumulate(slack[::-1])[::-1]
+        owned = np.zeros((len(inst.ids), N), dtype=bool)
+        owned[squads, races[:, None]] = True
+        owned_after = np.logical_or.accumulate(owned[:, ::-1], axis=1)[:, ::-1]
+        # A rider sold at race i cannot be bought back at race i
+        owned_before = np.zeros_like(owned)
+        owned_before[:, 1:] = owned[:, :-1]
+
+        best = (1e-9, None, None, None)
+        for o in squads[-1]:
+            # o can leave at any race from which it is owned without a break
+            first = N - 1
+            while first > 1 and owned[o, first - 1]:
+                first -= 1
+            po = inst.points[o]
+            starter = po >= kth
+            thr = np.where(starter, next_kth, kth)
+            loss = np.where(starter, po - next_kth, 0.0)
+            G = np.maximum(0.0, inst.points - thr) - loss
+            suffix = np.cumsum(G[:, ::-1], axis=1)[:, ::-1]
+            ok = (inst.price - inst.price[o])[:, None] <= slack_after[None, :]
+            ok &= ~owned_after & ~owned_before
+            ok[:, :first] = False
+            suffix = np.where(ok, suffix, -np.inf)
+            n, i = np.unravel_index(np.argmax(suffix), suffix.shape)
+            if suffix[n, i] > best[0]:
+                best = (suffix[n, i], int(i), int(o), int(n))
+        if best[1] is None:
+            break
+        _, i, o, n = best
+        squads[i:][squads[i:] == o] = n
+        transfers.append((i, o, n))
+    return squads
+
+def race_bound(inst):
+    """
+    Upper bound on the season points: the sum over races of the LP relaxation of picking the
+    race's lineup alone (at most race_squad_size riders within the budget left after the
+    cheapest bench). Its Lagrangian dual max(0, p - lam * price) is minimised over a grid of lam.
+    """
+    bench = np.sort(inst.price)[:max(0, inst.team_size - inst.size)].sum()
+    budget = inst.budget - bench
+    ratio = inst.points / np.maximum(inst.price, 1e-9)[:, None]
+    total = 0.0
+    for c in range(len(inst.race_ids)):
+        lo, hi = 0.0, float(ratio[:, c].max())
+        best = np.inf
+        for _ in range(3):
+            grid = np.linspace(lo, hi, 33)
+            vals = np.maximum(0.0, inst.points[:, c][:, None] - grid[None, :] * inst.price[:, None])
+            k = min(inst.size, len(vals))
+            top = -np.partition(-vals, k - 1, axis=0)[:k].sum(axis=0)
+            ub = top + grid * budget
+            j = int(np.argmin(ub))
+            best = min(best, float(ub[j]))
+            step = grid[1] - grid[0]
+            lo, hi = max(0.0, grid[j] - step), grid[j] + step
+        total += best
+    return total
+
+def lp_bound(req: SolverRequest, backend: str = "cbc", time_limit: int = 60):
+    """
+    Optimal value of the LP relaxation of the season model, a much tighter bound than race_bound
+    but too slow (about 1-2 s on the shipped data) for the anytime deadline. Values are
+    remembered per request, so later solve_anytime calls for the same request report the gap to it.
+    """
+    key = request_key(req)
+    with _LP_BOUNDS_LOCK:
+        if key in _LP_BOUNDS:
+            _LP_BOUNDS.move_to_end(key)
+            return _LP_BOUNDS[key]
+    pruned = prune_riders(req)
+    prob, _ = build_model(pruned.req, pruned.multiplicity)
+    value = solve_relaxation(prob, backend, time_limit)
+    if value is None:
+        return None
+    with _LP_BOUNDS_LOCK:
+        _LP_BOUNDS[key] = value
+        while len(_LP_BOUNDS) > MAX_LP_BOUNDS:
+            _LP_BOUNDS.popitem(last=False)
+    return value
+
+def solve_anytime(req: SolverRequest, deadline: float = 0.5, seed: int = 0, bound: float = None):
+    """
+    Large-neighbourhood search under a wall-clock deadline (seconds). A greedy squad is improved
+    by swaps and transfers are then added best-first; every iteration removes a few riders of
+    the best initial squad, refills it with randomised greedy choices and re-plans the
+    transfers. Budget, team_size, race_squad_size, max_transfers and the transfer fees follow
+    the same rules as the MILP.
+
+    Returns the best plan found in the solve_team schema, plus "iterations", "elapsed", an upper
+    "bound" and the relative "gap" to it. The bound is `bound` when given, else the LP relaxation
+    when lp_bound() has already computed it for this request, else race_bound; "bound_source"
+    says which ("given", "lp" or "race").
+    """
+    t0 = time.perf_counter()
+    stop = t0 + deadline
+    rng = np.random.default_rng(seed)
+    inst = _Instance(req)
+    if len(inst.ids) < req.team_size or np.sort(inst.price)[:req.team_size].sum() > req.budget:
+        return {"status": "Infeasible", "error": "No squad fits the budget"}
+
+    upper, source = race_bound(inst), "race"
+    if bound is None:
+        with _LP_BOUNDS_LOCK:
+            bound = _LP_BOUNDS.get(request_key(req))
+        given = "lp"
+    else:
+        given = "given"
+    if bound is not None and bound < upper:
+        upper, source = bound, given
+
+    squad = _fill(inst, [], rng, noise=0.0)
+    if squad is None:
+        return {"status": "Infeasible", "error": "No squad fits the budget"}
+    squad = _improve(inst, squad, stop)
+    best_squad, best_squads = squad, _plan_transfers(inst, squad, stop)
+    best_score = inst.score(best_squads)
+
+    iterations = 0
+    while time.perf_counter() < stop and best_score < upper - 1e-6:
+        iterations += 1
+        # Destroy: drop a few riders; repair: randomised greedy refill and local search
+        keep = rng.permutation(best_squad)[rng.integers(2, 7):]
+        squad = _fill(inst, keep, rng, noise=0.3)
+        if squad is None:
+            continue
+        squad = _improve(inst, squad, stop)
+        squads = _plan_transfers(inst, squad, stop)
+        score = inst.score(squads)
+        if score > best_score:
+            best_squad, best_squads, best_score = squad, squads, score
+
+    owned, starting = [], []
+    for i, squad in enumerate(best_squads):
+        lineup = squad[np.argsort(-inst.points[squad, i], kind="stable")[:inst.size]]
+        owned.append({inst.ids[r]: 1 for r in squad})
+        starting.append({inst.ids[r]: 1 for r in lineup})
+    solution = build_solution(req, {m: [m] for m in inst.ids}, owned, starting)
+    gap = (upper - solution["total_points"]) / upper if upper > 0 else 0.0
+    solution["status"] = "Optimal" if gap <= 1e-9 else "Feasible"
+    solution["bound"] = upper
+    solution["bound_source"] = source
+    solution["gap"] = max(0.0, gap)
+    solution["iterations"] = iterations
+    solution["elapsed"] = time.perf_counter() - t0
+    return solution
@@ -1,7 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
 import json
+from jobs import JobQueue
+from solve_cache import SolveCache
+from snapshot import COLUMNAR_MEDIA_TYPE, DEFAULT_PAGE_SIZE, Payload, SnapshotStore, dumps, encode_columnar, wants_columnar
+from solver import SolverRequest, request_from_data
+from transfers import TransferRequest, suggest_transfers
 
 app = FastAPI(title="Wielermanager Optimization API v3")
 
@@ -10,71 +18,193 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Data-Version"],  # read by the dashboard served from the Vite dev server
 )
 
-def load_data():
-    try:
-        with open("pcs_data_v3.json", "r") as f:
-            data = json.load(f)
-            return data.get("riders", []), data.get("races", [])
-    except Exception as e:
-        print("Warning: Could not load pcs_data_v3.json.")
-        return [], []
+# Loaded once per version of the file; see SnapshotStore
+DATA = SnapshotStore("pcs_data_v3.json")
+
+def payload_response(payload, request: Request):
+    """A pre-rendered Payload as a response: 304 when the client's ETag matches, precompressed when accepted."""
+    status, body, headers = payload.render(request.headers.get("if-none-match", ""), request.headers.get("accept-encoding", ""))
+    return Response(body, status_code=status, headers=headers, media_type=payload.media_type)
 
 @app.get("/api/riders")
-def get_riders():
-    RIDERS_DB, _ = load_data()
-    return RIDERS_DB
+def get_riders(request: Request, q: Optional[str] = None, team: Optional[str] = None, max_budget: Optional[float] = None,
+               starting: Optional[str] = None, sort: Optional[str] = None, race: Optional[str] = None,
+               limit: Optional[int] = None, cursor: Optional[str] = None, wire_format: Optional[str] = Query(None, alias="format")):
+    """
+    Without parameters: every rider. With any of them: one page of {"items", "total", "next_cursor"}
+    filtered by name (q), team, max_budget and the race a rider is `starting`, ordered by `sort`
+    (score_desc by default; race_desc ranks for `race`). Pass next_cursor back as `cursor` for
+    the next page.
+
+    format=columnar (or Accept: COLUMNAR_MEDIA_TYPE) encodes the riders column by column, see
+    encode_columnar.
+    """
+    snap = DATA.get()
+    try:
+        columnar = wants_columnar(wire_format, request.headers.get("accept", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type = COLUMNAR_MEDIA_TYPE if columnar else "application/json"
+    race_ids = [c["id"] for c in snap.races]
+    params = (q, team, max_budget, starting, sort, race, limit, cursor)
+    if all(p is None for p in params):
+        return payload_response(snap.riders_payload(columnar), request)
+    try:
+        page = snap.rider_index().query(q, team, max_budget, starting, sort or "score_desc", race,
+                                        DEFAULT_PAGE_SIZE if limit is None else limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if columnar:
+        page["items"] = encode_columnar(page["items"], race_ids)
+    return payload_response(Payload(dumps(page), media_type, "Accept, Accept-Encoding"), request)
 
 @app.get("/api/races")
-def get_races():
-    _, RACES_DB = load_data()
-    return RACES_DB
+def get_races(request: Request):
+    snap = DATA.get()
+    return payload_response(snap.races_payload(), request)
 
-@app.post("/api/solve")
-def solve_endpoint():
+@app.get("/api/changes")
+def get_changes(request: Request, since: int):
     """
-    Returns the ultimate 30-man squad (which is pre-calculated by the scraper).
-    For each race, selects the top 12 available riders from the 30-man squad
-    based strictly on their specific Top Competitor rank in that race.
+    Races whose results changed and riders whose price or ranks changed after data version
+    `since` (from X-Data-Version or an earlier call), plus removed ids; see Snapshot.changes_since.
     """
-    RIDERS_DB, RACES_DB = load_data()
+    snap = DATA.get()
+    try:
+        payload = snap.payload(("changes", since), lambda: dumps(snap.changes_since(since)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return payload_response(payload, request)
+
+def squad_solution(snap, squad=None):
+    """
+    Returns the ultimate 30-man squad (which is pre-calculated by the scraper), or the given
+    squad of rider ids. For each race, selects the top 12 riders of the squad that start it,
+    based strictly on their specific Top Competitor rank in that race (see RiderIndex.lineup).
+    """
+    RIDERS_DB, RACES_DB = snap.riders, snap.races
     if not RIDERS_DB:
         return {"error": "No rider data available"}
-        
-    squad_ids = [r['id'] for r in RIDERS_DB] # Exactly the top 30
-    total_score = sum(r.get('global_score', 0) for r in RIDERS_DB)
-    
-    solution = {
+    index = snap.rider_index()
+
+    if squad is None:
+        squad_ids = [r['id'] for r in RIDERS_DB] # Exactly the top 30
+        members = None
+    else:
+        squad_ids = list(dict.fromkeys(squad))
+        members = [index.positions[r] for r in squad_ids]
+    total_score = sum(RIDERS_DB[index.positions[r]].get('global_score', 0) for r in squad_ids)
+
+    return {
         "status": "Optimal",
         "total_points": total_score,
         "squad_riders": squad_ids,
-        "races": []
+        "races": [{"race_id": race['id'], "selected": index.lineup(race['id'], members)} for race in RACES_DB],
     }
-    
-    for race in RACES_DB:
-        race_id = race['id']
-        
-        # 1. Filter the 30-man squad to riders who actually start this race
-        starters = [r for r in RIDERS_DB if race_id in r.get('starts', [])]
-        
-        # 2. Sort by their top_ranks for this specific race
-        # Lowest rank number is best. If they aren't explicitly ranked on top_competitors, give them 999.
-        def get_rank(rider):
-            ranks = rider.get('top_ranks', {})
-            return ranks.get(race_id, 999)
-            
-        starters.sort(key=get_rank)
-        
-        # 3. Take top 12
-        selected_riders = [r['id'] for r in starters[:12]]
-        
-        solution["races"].append({
-            "race_id": race_id,
-            "selected": selected_riders,
-        })
-        
-    return solution
+
+class SquadRequest(BaseModel):
+    riders: List[str]
+
+@app.post("/api/solve")
+def solve_endpoint(req: Optional[SquadRequest] = None):
+    snap = DATA.get()
+    if req is None:
+        # Only depends on the data: computed and serialised once per snapshot
+        return Response(snap.cached("solve", lambda: dumps(squad_solution(snap))), media_type="application/json")
+    if snap.riders:
+        unknown = [r for r in req.riders if r not in snap.rider_index().positions]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown riders: {', '.join(unknown)}")
+    return squad_solution(snap, req.riders)
+
+# Full MILP solves run in a bounded pool of solver processes, never inside a request handler;
+# repeated requests are answered from the solve cache
+SOLVE_JOBS = JobQueue(workers=2, max_queued=32, cache=SolveCache(maxsize=128))
+
+@app.post("/api/solve/jobs", status_code=202)
+def submit_solve_job(req: SolverRequest):
+    job = SOLVE_JOBS.submit(req, data_version=DATA.get().digest)
+    if job is None:
+        raise HTTPException(status_code=503, detail="Solver queue is full, retry later", headers={"Retry-After": "10"})
+    return {"id": job.id, "status": job.status}
+
+@app.get("/api/solve/jobs/stats")
+def solve_job_stats():
+    return SOLVE_JOBS.stats()
+
+@app.get("/api/solve/jobs/{job_id}")
+def get_solve_job(job_id: str):
+    job = SOLVE_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job.to_dict()
+
+@app.get("/api/solve/jobs/{job_id}/events")
+async def stream_solve_job(job_id: str):
+    """Server-sent events: one `incumbent` event per new CBC incumbent, then a final `status` event."""
+    job = SOLVE_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+
+    async def events():
+        sent = 0
+        while True:
+            incumbents = job.incumbents()
+            for inc in incumbents[sent:]:
+                yield f"event: incumbent\ndata: {json.dumps(inc)}\n\n"
+            sent = len(incumbents)
+            if job.status not in ("queued", "running"):
+                yield f"event: status\ndata: {json.dumps(job.to_dict())}\n\n"
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.delete("/api/solve/jobs/{job_id}")
+def cancel_solve_job(job_id: str):
+    job = SOLVE_JOBS.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job.to_dict(with_result=False)
+
+@app.post("/api/transfers")
+def transfer_suggestions(req: TransferRequest):
+    """
+    Best single and double transfers for a user's squad before `from_race` (default: the next race
+    not completed), scored over the races from there on with the solver's budget and fee rules.
+
+    Only served by this backend API: the webapp's Vercel function (webapp/api) does not ship the
+    solver modules and their PuLP dependency, so the dashboard cannot reach it in production.
+    """
+    snap = DATA.get()
+    RIDERS_DB, RACES_DB = snap.riders, snap.races
+    race_ids = [c["id"] for c in RACES_DB]
+    if req.from_race is None:
+        start = next((i for i, c in enumerate(RACES_DB) if not c.get("is_completed")), len(RACES_DB))
+    elif req.from_race in race_ids:
+        start = race_ids.index(req.from_race)
+    else:
+        raise HTTPException(status_code=404, detail="Unknown race")
+    known = {r["id"] for r in RIDERS_DB}
+    unknown = [r for r in req.riders if r not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown riders: {', '.join(unknown)}")
+
+    solver_req = request_from_data(
+        {"riders": RIDERS_DB, "races": RACES_DB[start:]},
+        include_unpriced=True,
+        budget=req.budget,
+        # The game's season cap unless the caller sets one
+        max_transfers=req.max_transfers if req.max_transfers is not None else SolverRequest.model_fields["max_transfers"].default,
+        race_squad_size=req.race_squad_size,
+    )
+    try:
+        return suggest_transfers(solver_req, list(dict.fromkeys(req.riders)), req.transfers_used, req.top_n, req.doubles)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
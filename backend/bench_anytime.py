@@ -0,0 +1,63 @@
+import argparse
+import time
+from anytime import lp_bound, solve_anytime
+from instances import synthetic_request
+from solver import load_request, solve_team
+
+def violations(req, solution):
+    """Rule breaks of a solution in the solve_team schema (empty when it is feasible)."""
+    prices = {r.id: r.price for r in req.riders}
+    points = {r.id: r.expected_points for r in req.riders}
+    problems = []
+    made = 0
+    total = 0.0
+    prev = None
+    for race in solution["races"]:
+        team, selected = set(race["team"]), set(race["selected"])
+        c = race["race_id"]
+        if len(team) != req.team_size:
+            problems.append(f"{c}: squad of {len(team)}")
+        if len(selected) != req.race_squad_size or not selected <= team:
+            problems.append(f"{c}: lineup of {len(selected)} not within the squad")
+        if prev is not None:
+            if set(race["transfers_in"]) != team - prev or set(race["transfers_out"]) != prev - team:
+                problems.append(f"{c}: transfers do not match the squad change")
+            made += len(team - prev)
+        if sum(prices[r] for r in team) + max(0, made - 3) > req.budget + 1e-6:
+            problems.append(f"{c}: over budget after fees")
+        total += sum(points[r].get(c, 0.0) for r in selected)
+        prev = team
+    if made > req.max_transfers:
+        problems.append(f"{made} transfers")
+    if abs(total - solution["total_points"]) > 1e-6:
+        problems.append("total_points does not match the lineups")
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Anytime heuristic vs the exact MILP.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--deadline", type=float, default=0.5)
+    parser.add_argument("--exact", action="store_true", help="Also solve every instance to optimality")
+    args = parser.parse_args()
+
+    instances = [
+        ("shipped budget=40", load_request(args.db)),
+        ("shipped budget=120", load_request(args.db, budget=120)),
+        ("shipped budget=100", load_request(args.db, budget=100, max_transfers=8)),
+        ("synthetic 500x20", synthetic_request(500, 20, budget=120)),
+        ("synthetic 2000x60", synthetic_request(2000, 60, budget=120, max_transfers=8)),
+    ]
+    for name, req in instances:
+        t0 = time.perf_counter()
+        bound = lp_bound(req)
+        lp_time = time.perf_counter() - t0
+        race_only = solve_anytime(req, args.deadline, bound=float("inf"))
+        s = solve_anytime(req, args.deadline)
+        line = (f"{name:<20} anytime={s['total_points']:8.1f} in {s['elapsed']:.2f}s ({s['iterations']} LNS iterations) "
+                f"lp_bound={bound:.1f} ({lp_time:.2f}s) gap={s['gap']:.2%} race_bound gap={race_only['gap']:.2%}")
+        if args.exact:
+            t0 = time.perf_counter()
+            exact = solve_team(req, time_limit=120)
+            line += f" milp={exact.get('total_points')} ({time.perf_counter() - t0:.1f}s)"
+        problems = violations(req, s)
+        print(line + (f" INVALID: {problems}" if problems else ""), flush=True)
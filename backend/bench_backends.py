@@ -0,0 +1,32 @@
+import argparse
+from diagnostics import phase_time
+from instances import synthetic_request
+from milp_backends import available_backends
+from solver import load_request, solve_team
+
+def run(name, req, backend, time_limit):
+    # No warm start: every backend starts from the same bare model
+    solution = solve_team(req, warm_start=False, time_limit=time_limit, backend=backend, diagnostics=True)
+    diag = solution["diagnostics"]
+    build_time = phase_time(diag, "presolve", "build")
+    solve_time = phase_time(diag, "solve")
+    extract_time = phase_time(diag, "extract", "build_solution")
+    print(f"{name:<22} {backend:<6} build={build_time:6.2f}s solve={solve_time:7.2f}s extract={extract_time:5.2f}s "
+          f"status={solution['status']} points={solution.get('total_points')}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build / solve / extract time per MILP backend.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--time-limit", type=int, default=60)
+    parser.add_argument("--backends", default=",".join(available_backends()))
+    args = parser.parse_args()
+
+    instances = [
+        ("shipped budget=120", load_request(args.db, budget=120)),
+        ("shipped budget=100", load_request(args.db, budget=100, max_transfers=8)),
+        ("synthetic 200x10", synthetic_request(200, 10, budget=100)),
+        ("synthetic 600x25", synthetic_request(600, 25, budget=100)),
+    ]
+    for name, req in instances:
+        for backend in args.backends.split(","):
+            run(name, req, backend, args.time_limit)
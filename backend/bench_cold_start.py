@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Runs in a fresh interpreter per sample: import the Vercel entry point, then send it the first
+# requests of a dashboard load as raw ASGI calls (no test client, which would import more).
+PROBE = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import index
+timings = {"import": time.perf_counter() - t0}
+
+async def call(method, path, query=b"", headers=()):
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "https",
+             "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query, "headers": list(headers),
+             "client": ("127.0.0.1", 0), "server": ("bench", 443)}
+    await index.app(scope, receive, send)
+    assert messages[0]["status"] == 200, (path, messages[0]["status"])
+
+async def main():
+    headers = [(b"accept-encoding", b"gzip, deflate, br"), (b"origin", b"https://example.com")]
+    for name, method, path, query in [("riders", "GET", "/api/riders", b"format=columnar"), ("races", "GET", "/api/races", b""),
+                                      ("solve", "POST", "/api/solve", b"")]:
+        t = time.perf_counter()
+        await call(method, path, query, headers)
+        timings[name] = time.perf_counter() - t
+
+asyncio.run(main())
+timings["first_byte"] = timings["import"] + timings["riders"]
+print(json.dumps(timings))
+"""
+
+def sample(api_dir, fast_start):
+    env = {**os.environ, "WIELERMANAGER_FAST_START": "1" if fast_start else "0"}
+    out = subprocess.run([sys.executable, "-c", PROBE, api_dir], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start of the Vercel function: prebuilt fast path against eager FastAPI.")
+    parser.add_argument("--api-dir", default="../webapp/api")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    api_dir = os.path.abspath(args.api_dir)
+    columns = ["import", "riders", "races", "solve", "first_byte"]
+    print(f"{'mode':<8}" + "".join(f"{c:>12}" for c in columns) + "   (median ms)")
+    for name, fast_start in (("eager", False), ("fast", True)):
+        runs = [sample(api_dir, fast_start) for _ in range(args.runs)]
+        print(f"{name:<8}" + "".join(f"{1000 * statistics.median(r[c] for r in runs):12.1f}" for c in columns))
@@ -0,0 +1,26 @@
+import argparse
+import time
+from instances import synthetic_request
+from solver import load_request, solve_team
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cost of reporting the LP bound and gap with an exact solve.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--backend", default="cbc")
+    parser.add_argument("--time-limit", type=int, default=120)
+    args = parser.parse_args()
+
+    instances = [
+        ("shipped budget=40", load_request(args.db)),
+        ("shipped budget=120", load_request(args.db, budget=120)),
+        ("synthetic 500x20", synthetic_request(500, 20, budget=120)),
+    ]
+    for name, req in instances:
+        for lp_bound in (False, True):
+            t0 = time.perf_counter()
+            s = solve_team(req, lp_bound=lp_bound, backend=args.backend, time_limit=args.time_limit)
+            elapsed = time.perf_counter() - t0
+            line = f"{name:<20} lp_bound={lp_bound!s:<5} {elapsed:6.1f}s points={s.get('total_points')}"
+            if "lp" in s:
+                line += f" bound={s['bound']:.1f} gap={s['gap']:.2%} lp={s['lp']['lp_time']:.1f}s"
+            print(line, flush=True)
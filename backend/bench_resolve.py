@@ -0,0 +1,23 @@
+import argparse
+import time
+from solver import load_request, solve_team, resolve_team, TeamHistory
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of mid-season re-solves that freeze completed races.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--budget", type=float, default=40.0)
+    parser.add_argument("--max-transfers", type=int, default=4)
+    parser.add_argument("--completed", default="2,6,10,14,17", help="Comma separated numbers of completed races")
+    args = parser.parse_args()
+
+    req = load_request(args.db, budget=args.budget, max_transfers=args.max_transfers)
+    t0 = time.perf_counter()
+    season = solve_team(req)
+    print(f"full season: points={season['total_points']} time={time.perf_counter() - t0:.2f}s")
+
+    # Replay the optimal plan as if it had been fielded, then re-solve the rest
+    for done in (int(k) for k in args.completed.split(",")):
+        history = [TeamHistory(race_id=race["race_id"], team=race["team"], selected=race["selected"]) for race in season["races"][:done]]
+        t0 = time.perf_counter()
+        again = resolve_team(req, history)
+        print(f"{done:>2} completed: points={again.get('total_points')} time={time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,30 @@
+import argparse
+import time
+from solver import load_request, solve_team
+
+def timed(req, **kwargs):
+    t0 = time.perf_counter()
+    solution = solve_team(req, **kwargs)
+    return solution, time.perf_counter() - t0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quality gap and runtime of the rolling-horizon mode against the exact solve.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--budget", type=float, default=40.0)
+    parser.add_argument("--max-transfers", type=int, default=4)
+    parser.add_argument("--windows", default="2,3,4", help="Comma separated window sizes")
+    args = parser.parse_args()
+
+    req = load_request(args.db, budget=args.budget, max_transfers=args.max_transfers)
+    print(f"{len(req.riders)} riders, {len(req.races)} races, budget {args.budget}, {args.max_transfers} transfers")
+
+    exact, exact_time = timed(req)
+    print(f"exact       points={exact.get('total_points')} time={exact_time:.1f}s")
+
+    for window in (int(w) for w in args.windows.split(",")):
+        rolling, rolling_time = timed(req, mode="rolling", window=window)
+        if "error" in rolling or "error" in exact:
+            print(f"rolling K={window} status={rolling['status']}")
+            continue
+        gap = 100 * (exact["total_points"] - rolling["total_points"]) / max(exact["total_points"], 1e-9)
+        print(f"rolling K={window} points={rolling['total_points']} time={rolling_time:.1f}s gap={gap:.2f}%")
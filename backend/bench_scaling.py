@@ -0,0 +1,103 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pulp
+from diagnostics import peak_rss_mb, phase_time
+from instances import synthetic_request
+from solver import solve_team
+
+DEFAULT_SIZES = "100x5,200x10,500x20,1000x30,2000x60"
+
+def measure(n_riders, n_races, seed, backend, time_limit, **request_args):
+    """One instance, timed per phase. Runs in a fresh worker process so peak RSS is its own."""
+    req = synthetic_request(n_riders, n_races, seed=seed, **request_args)
+    # No warm start, as in bench_backends
+    solution = solve_team(req, warm_start=False, time_limit=time_limit, backend=backend, diagnostics=True)
+    diag = solution["diagnostics"]
+    rss, solver_rss = peak_rss_mb()
+    return {
+        "instance": f"{n_riders}x{n_races}",
+        "riders": n_riders,
+        "races": n_races,
+        "seed": seed,
+        "backend": backend,
+        "status": solution["status"],
+        "objective": solution.get("total_points"),
+        "build_time": phase_time(diag, "presolve", "build"),
+        "solve_time": phase_time(diag, "solve"),
+        "extract_time": phase_time(diag, "extract", "build_solution"),
+        # CBC runs as a child process, HiGHS inside this one
+        "peak_rss_mb": rss,
+        "solver_peak_rss_mb": solver_rss,
+        "model": {**diag["model"], **diag.get("presolve", {})},
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, tolerance):
+    """Lines for every instance that got slower by more than `tolerance` or lost points vs the baseline."""
+    old = {(r["instance"], r["seed"], r["backend"]): r for r in baseline["results"]}
+    lines = []
+    for r in results:
+        b = old.get((r["instance"], r["seed"], r["backend"]))
+        if b is None:
+            continue
+        for phase in ("build_time", "solve_time", "extract_time"):
+            if r[phase] > b[phase] * (1 + tolerance) and r[phase] - b[phase] > 0.05:
+                lines.append(f"{r['instance']} {r['backend']}: {phase} {b[phase]:.2f}s -> {r[phase]:.2f}s")
+        if b["objective"] is not None and (r["objective"] or 0) < b["objective"]:
+            lines.append(f"{r['instance']} {r['backend']}: objective {b['objective']} -> {r['objective']}")
+    return lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the MILP on synthetic instances.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma separated RIDERSxRACES")
+    parser.add_argument("--seeds", type=int, default=1, help="Instances per size")
+    parser.add_argument("--backends", default="cbc")
+    parser.add_argument("--budget", type=float, default=120)
+    parser.add_argument("--max-transfers", type=int, default=4)
+    parser.add_argument("--time-limit", type=int, default=60)
+    parser.add_argument("--out", default="bench_scaling.json")
+    parser.add_argument("--baseline", help="Earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes.split(","):
+        n_riders, n_races = (int(x) for x in size.split("x"))
+        for seed in range(args.seeds):
+            for backend in args.backends.split(","):
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    r = pool.submit(measure, n_riders, n_races, seed, backend, args.time_limit,
+                                    budget=args.budget, max_transfers=args.max_transfers).result()
+                results.append(r)
+                print(f"{r['instance']:<10} seed={seed} {backend:<6} build={r['build_time']:6.2f}s solve={r['solve_time']:7.2f}s "
+                      f"extract={r['extract_time']:5.2f}s rss={r['peak_rss_mb'] or 0:.0f}/{r['solver_peak_rss_mb'] or 0:.0f}MB "
+                      f"status={r['status']} objective={r['objective']}", flush=True)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pulp": pulp.__version__,
+        "args": vars(args),
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        sys.exit(1 if regressions else 0)
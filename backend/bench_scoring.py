@@ -0,0 +1,39 @@
+import argparse
+import time
+import numpy as np
+from heuristics import best_lineup
+from scoring import SquadScorer
+from solver import load_request
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fixed-squad scoring: vectorised vs per-race Python sorts.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--squads", type=int, default=20000)
+    args = parser.parse_args()
+
+    req = load_request(args.db)
+    scorer = SquadScorer.from_request(req)
+    rng = np.random.default_rng(0)
+    squads = np.array([rng.choice(len(req.riders), req.team_size, replace=False) for _ in range(args.squads)])
+
+    t0 = time.perf_counter()
+    result = scorer.score(squads, req.race_squad_size)
+    vector_time = time.perf_counter() - t0
+
+    # Reference: sorted() per race, as api.solve_endpoint and heuristics.best_lineup do
+    points = {r.id: r.expected_points for r in req.riders}
+    sample = squads[:1000]
+    t0 = time.perf_counter()
+    reference = []
+    for squad in sample:
+        ids = [scorer.rider_ids[r] for r in squad]
+        reference.append(sum(points[r].get(c, 0.0) for c in scorer.race_ids for r in best_lineup(ids, c, points, req.race_squad_size)))
+    python_time = time.perf_counter() - t0
+
+    assert np.allclose(result["total"][:len(sample)], reference)
+    print(f"vectorised: {args.squads / vector_time:,.0f} squads/s ({args.squads} squads in {vector_time:.3f}s)")
+    print(f"python:     {len(sample) / python_time:,.0f} squads/s ({len(sample)} squads in {python_time:.3f}s)")
+
+    t0 = time.perf_counter()
+    scorer.score(squads, req.race_squad_size, lineups=True)
+    print(f"with lineups: {args.squads / (time.perf_counter() - t0):,.0f} squads/s")
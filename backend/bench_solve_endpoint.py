@@ -0,0 +1,48 @@
+import argparse
+import random
+import time
+from api import squad_solution
+from snapshot import SnapshotStore
+
+def scan_solution(riders, races, squad=None):
+    """The per-request scan /api/solve used before the lineup index, for reference."""
+    members = riders if squad is None else [r for r in riders if r["id"] in set(squad)]
+    solution = {"status": "Optimal", "total_points": sum(r.get("global_score", 0) for r in members),
+                "squad_riders": [r["id"] for r in members], "races": []}
+    for race in races:
+        starters = [r for r in members if race["id"] in r.get("starts", [])]
+        starters.sort(key=lambda r: r.get("top_ranks", {}).get(race["id"], 999))
+        solution["races"].append({"race_id": race["id"], "selected": [r["id"] for r in starters[:12]]})
+    return solution
+
+def timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/api/solve: lineup index against the per-request scan.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--squads", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    snap = SnapshotStore(args.db).get()
+    t0 = time.perf_counter()
+    snap.rider_index()
+    print(f"index build {1000 * (time.perf_counter() - t0):.1f} ms (once per snapshot)")
+
+    rng = random.Random(0)
+    ids = [r["id"] for r in snap.riders]
+    # Squads in database order, so the reference keeps the same order of squad_riders
+    squads = [sorted(rng.sample(ids, 20), key=ids.index) for _ in range(args.squads)]
+    assert squad_solution(snap) == scan_solution(snap.riders, snap.races)
+    for squad in squads:
+        assert squad_solution(snap, squad) == scan_solution(snap.riders, snap.races, squad)
+
+    print(f"all riders   scan {timed(lambda: scan_solution(snap.riders, snap.races), args.repeat):7.3f} ms"
+          f"   index {timed(lambda: squad_solution(snap), args.repeat):7.3f} ms")
+    scan = timed(lambda: [scan_solution(snap.riders, snap.races, s) for s in squads], 1) / len(squads)
+    index = timed(lambda: [squad_solution(snap, s) for s in squads], 1) / len(squads)
+    print(f"20-man squad scan {scan:7.3f} ms   index {index:7.3f} ms")
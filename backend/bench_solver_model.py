@@ -0,0 +1,115 @@
+import argparse
+import sys
+import time
+import pulp
+from solver import SolverRequest, load_request, build_model, model_size
+from presolve import prune_riders
+
+def build_reference_model(req: SolverRequest):
+    """
+    The original solve_team formulation (cumulative transfers re-summed for every race,
+    explicit IN == OUT balance and in/out bound rows). Kept only as a regression reference.
+    """
+    prob = pulp.LpProblem("Wielermanager_Reference", pulp.LpMaximize)
+
+    R = [r.id for r in req.riders]
+    C = [c.id for c in req.races]
+    N = len(C)
+    prices = {r.id: r.price for r in req.riders}
+    points = {r.id: r.expected_points for r in req.riders}
+
+    in_team = pulp.LpVariable.dicts("in_team", (R, C), cat="Binary")
+    selected = pulp.LpVariable.dicts("selected", (R, C), cat="Binary")
+    transfer_in = pulp.LpVariable.dicts("transfer_in", (R, C[1:]), cat="Binary")
+    transfer_out = pulp.LpVariable.dicts("transfer_out", (R, C[1:]), cat="Binary")
+    fees = pulp.LpVariable.dicts("fees", C, lowBound=0, cat="Continuous")
+
+    prob += pulp.lpSum(points[r].get(c, 0.0) * selected[r][c] for r in R for c in C), "TotalExpectedPoints"
+
+    c0 = C[0]
+    prob += pulp.lpSum(in_team[r][c0] for r in R) == req.team_size, "Initial_Team_Size"
+    prob += pulp.lpSum(prices[r] * in_team[r][c0] for r in R) <= req.budget, "Initial_Budget"
+    prob += pulp.lpSum(selected[r][c0] for r in R) == req.race_squad_size, f"Squad_Size_{c0}"
+    for r in R:
+        prob += selected[r][c0] <= in_team[r][c0], f"Must_own_{r}_{c0}"
+    prob += fees[c0] == 0, "Fee_Initial"
+
+    for i in range(1, N):
+        prev_c = C[i-1]
+        curr_c = C[i]
+        prob += pulp.lpSum(in_team[r][curr_c] for r in R) == req.team_size, f"Team_Size_{curr_c}"
+        prob += pulp.lpSum(selected[r][curr_c] for r in R) == req.race_squad_size, f"Squad_Size_{curr_c}"
+        prob += pulp.lpSum(transfer_in[r][curr_c] for r in R) == pulp.lpSum(transfer_out[r][curr_c] for r in R), f"Transfer_Balance_{curr_c}"
+        cum_transfers = pulp.lpSum(transfer_in[r][c] for r in R for c in C[1:i+1])
+        prob += fees[curr_c] >= 0, f"Fee_Positive_{curr_c}"
+        prob += fees[curr_c] >= cum_transfers - 3, f"Fee_Formula_{curr_c}"
+        current_team_cost = pulp.lpSum(prices[r] * in_team[r][curr_c] for r in R)
+        prob += current_team_cost + fees[curr_c] <= req.budget, f"Budget_{curr_c}"
+        for r in R:
+            prob += selected[r][curr_c] <= in_team[r][curr_c], f"Must_own_{r}_{curr_c}"
+            prob += in_team[r][curr_c] == in_team[r][prev_c] + transfer_in[r][curr_c] - transfer_out[r][curr_c], f"Evolution_{r}_{curr_c}"
+            prob += transfer_in[r][curr_c] <= 1 - in_team[r][prev_c], f"Max_Transfer_In_{r}_{curr_c}"
+            prob += transfer_out[r][curr_c] <= in_team[r][prev_c], f"Max_Transfer_Out_{r}_{curr_c}"
+
+    prob += pulp.lpSum(transfer_in[r][c] for r in R for c in C[1:]) <= req.max_transfers, "Max_Global_Transfers"
+    return prob
+
+def run(name, builder, req, time_limit):
+    t0 = time.perf_counter()
+    prob = builder(req)
+    if isinstance(prob, tuple):
+        prob = prob[0]
+    build_time = time.perf_counter() - t0
+    rows, cols, nnz = model_size(prob)
+
+    t0 = time.perf_counter()
+    prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit))
+    solve_time = time.perf_counter() - t0
+
+    status = pulp.LpStatus[prob.status]
+    objective = pulp.value(prob.objective)
+    print(f"{name:<10} rows={rows:>7} cols={cols:>7} nnz={nnz:>8} build={build_time:6.2f}s solve={solve_time:6.2f}s status={status} objective={objective}")
+    return status, objective
+
+def same(a, b):
+    """Both runs end in the same status, with the same objective when optimal."""
+    return a[0] == b[0] and (a[0] != "Optimal" or abs(a[1] - b[1]) < 1e-6)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the reference and compact solve_team models.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--riders", type=int, default=0, help="Only keep the N highest scoring riders (0 = all)")
+    parser.add_argument("--races", type=int, default=0, help="Only keep the first N races (0 = all)")
+    parser.add_argument("--budget", type=float, default=40.0)
+    parser.add_argument("--time-limit", type=int, default=60)
+    parser.add_argument("--prune", action="store_true", help="Also solve the compact model after dominated-rider pruning")
+    args = parser.parse_args()
+
+    req = load_request(args.db, budget=args.budget)
+    if args.riders:
+        req.riders = sorted(req.riders, key=lambda r: -sum(r.expected_points.values()))[:args.riders]
+    if args.races:
+        req.races = req.races[:args.races]
+    print(f"{len(req.riders)} riders, {len(req.races)} races")
+
+    ref = run("reference", build_reference_model, req, args.time_limit)
+    new = run("compact", build_model, req, args.time_limit)
+
+    ok = same(ref, new)
+    if ok:
+        print("OK: objectives match")
+    else:
+        print(f"MISMATCH: reference={ref} compact={new}")
+
+    if args.prune:
+        pruned = prune_riders(req)
+        print(f"presolve: {pruned.stats}")
+        multiplicity = pruned.multiplicity
+        pru = run("pruned", lambda r: build_model(r, multiplicity), pruned.req, args.time_limit)
+        if same(pru, new):
+            print("OK: pruned objective matches")
+        else:
+            print(f"MISMATCH: compact={new} pruned={pru}")
+            ok = False
+
+    sys.exit(0 if ok else 1)
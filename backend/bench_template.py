@@ -0,0 +1,43 @@
+import argparse
+import time
+from presolve import prune_riders
+from solver import load_request, build_model, get_template, solve_team
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model build latency: fresh build_model against patching a cached ModelTemplate.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--solve", action="store_true", help="Also check both paths reach the same objective")
+    args = parser.parse_args()
+
+    base = load_request(args.db, budget=120)
+    pruned = prune_riders(base)
+    multiplicity = pruned.multiplicity
+    print(f"{len(pruned.req.riders)} model riders, {len(base.races)} races")
+
+    # Requests that keep the structure: only budget changes (max_transfers would change the pruning)
+    requests = [pruned.req.model_copy(update={"budget": 110.0 + 5 * i}) for i in range(args.repeats)]
+
+    t0 = time.perf_counter()
+    for req in requests:
+        build_model(req, multiplicity)
+    fresh = (time.perf_counter() - t0) / len(requests)
+
+    t0 = time.perf_counter()
+    template = get_template(requests[0], multiplicity)
+    first = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for req in requests:
+        template.patch(req)
+    patched = (time.perf_counter() - t0) / len(requests)
+
+    print(f"fresh build_model: {fresh * 1000:.0f} ms/request")
+    print(f"template: first build {first * 1000:.0f} ms, then patch {patched * 1000:.0f} ms/request")
+
+    if args.solve:
+        for budget in (100.0, 120.0):
+            req = base.model_copy(update={"budget": budget})
+            a = solve_team(req)["total_points"]
+            b = solve_team(req, reuse_model=True)["total_points"]
+            print(f"budget {budget}: fresh={a} template={b} {'OK' if a == b else 'MISMATCH'}")
@@ -0,0 +1,43 @@
+import argparse
+import time
+import numpy as np
+from anytime import solve_anytime
+from instances import synthetic_request
+from solver import load_request
+from transfers import suggest_transfers
+
+def squads_for(req, rng, count):
+    """A strong squad (anytime solver, first race) and random squads that fit the budget."""
+    plan = solve_anytime(req, 0.5)
+    squads = [plan["races"][0]["team"]] if "races" in plan else []
+    prices = {r.id: r.price for r in req.riders}
+    ids = list(prices)
+    while len(squads) < count:
+        squad = list(rng.choice(ids, req.team_size, replace=False))
+        if sum(prices[r] for r in squad) <= req.budget:
+            squads.append(squad)
+    return squads
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of the transfer suggestions per squad.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--squads", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    instances = [
+        ("shipped", load_request(args.db, budget=120, max_transfers=6)),
+        ("synthetic 2000x60", synthetic_request(2000, 60, budget=120, max_transfers=6)),
+    ]
+    for name, req in instances:
+        for squad in squads_for(req, rng, args.squads):
+            # Suggestions before the second race, with two transfers already made
+            remaining = req.model_copy(update={"races": req.races[1:]})
+            t0 = time.perf_counter()
+            result = suggest_transfers(remaining, squad, transfers_used=2)
+            elapsed = time.perf_counter() - t0
+            best_single = result["singles"][0]["gain"] if result["singles"] else None
+            best_double = result["doubles"][0]["gain"] if result["doubles"] else None
+            print(f"{name:<18} {elapsed * 1000:7.1f} ms  singles={result['evaluated']['singles']:<6} "
+                  f"doubles={result['evaluated']['doubles']:<8} exhaustive={result['exhaustive']} "
+                  f"best single={best_single} best double={best_double}")
@@ -0,0 +1,53 @@
+import argparse
+import os
+import tempfile
+import time
+import pulp
+from solver import load_request, build_model, set_warm_start
+from milp_backends import INCUMBENT_RE
+from presolve import prune_riders
+
+def first_incumbent(log_file):
+    """(objective, seconds) of the first integer solution CBC reports in its log."""
+    with open(log_file, "r") as f:
+        for line in f:
+            m = INCUMBENT_RE.search(line)
+            if m:
+                return abs(float(m.group(1))), float(m.group(2))
+    return None, None
+
+def run(req, warm, time_limit):
+    pruned = prune_riders(req)
+    prob, v = build_model(pruned.req, pruned.multiplicity)
+
+    t0 = time.perf_counter()
+    plan = set_warm_start(req, v, pruned.classes) if warm else None
+    greedy_time = time.perf_counter() - t0
+
+    fd, log_file = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, warmStart=plan is not None, logPath=log_file))
+        solve_time = time.perf_counter() - t0
+        first_obj, first_time = first_incumbent(log_file)
+    finally:
+        os.remove(log_file)
+
+    name = "warm" if warm else "cold"
+    greedy = f" greedy={plan['total_points']:.0f} in {greedy_time:.2f}s" if plan else ""
+    print(f"{name}:{greedy} first incumbent={first_obj} after {first_time}s (cbc clock), "
+          f"optimal={pulp.value(prob.objective)} status={pulp.LpStatus[prob.status]} total={greedy_time + solve_time:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to first incumbent / optimum with and without the greedy warm start.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--budget", type=float, default=40.0)
+    parser.add_argument("--max-transfers", type=int, default=4)
+    parser.add_argument("--time-limit", type=int, default=60)
+    args = parser.parse_args()
+
+    req = load_request(args.db, budget=args.budget, max_transfers=args.max_transfers)
+    print(f"{len(req.riders)} riders, {len(req.races)} races, budget {args.budget}")
+    run(req, False, args.time_limit)
+    run(req, True, args.time_limit)
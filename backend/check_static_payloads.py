@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import gzip
+import os
+import sys
+
+# Artefact key -> (file name stem in the build output, path and query of the live endpoint);
+# the stems and file names follow STATIC_PAYLOADS and staticFileName in webapp/static-api.ts
+STATIC_PAYLOADS = {
+    "riders": ("riders", "/api/riders", b""),
+    "riders_columnar": ("riders-columnar", "/api/riders", b"format=columnar"),
+    "races": ("races", "/api/races", b""),
+}
+SUFFIXES = {"identity": "", "gzip": ".gz", "br": ".br"}
+
+def snapshot_copy_problems(api_dir):
+    """The Vercel function's _snapshot.py must be an exact copy of snapshot.py (ETags, artefact format)."""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshot.py"), "rb") as f:
+        source = f.read()
+    try:
+        with open(os.path.join(api_dir, "_snapshot.py"), "rb") as f:
+            copy = f.read()
+    except OSError:
+        copy = None
+    if copy == source:
+        return []
+    return [f"{os.path.join(api_dir, '_snapshot.py')} is not a copy of backend/snapshot.py; run: cp backend/snapshot.py webapp/api/_snapshot.py"]
+
+async def get(app, path, query, accept_encoding):
+    """(status, headers, body) of a GET sent straight to an ASGI app."""
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query,
+             "headers": [(b"accept-encoding", accept_encoding.encode())], "client": ("127.0.0.1", 0), "server": ("check", 80)}
+    await app(scope, receive, send)
+    headers = {k.decode().lower(): v.decode() for k, v in messages[0]["headers"]}
+    return messages[0]["status"], headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+def decode(body, coding):
+    if coding == "br":
+        import brotli
+        return brotli.decompress(body)
+    return gzip.decompress(body) if coding == "gzip" else body
+
+async def check(dist, api_dir):
+    """
+    Compares every static payload file in the build output with the response of the live
+    function (index.py, every encoding) and, decoded, with the FastAPI app rendering the data
+    file itself (no artefact), after checking the _snapshot.py copy. Returns the list of problems.
+    """
+    problems = snapshot_copy_problems(api_dir)
+    if problems:
+        return problems
+    sys.path.insert(0, api_dir)
+    import index
+    import _app
+    from _snapshot import SnapshotStore
+    _app.DATA = SnapshotStore(os.path.join(api_dir, "pcs_data_v3.json"))
+    for key, (stem, path, query) in STATIC_PAYLOADS.items():
+        rendered = (await get(_app.app, path, query, "identity"))[2]
+        for coding, suffix in SUFFIXES.items():
+            status, headers, body = await get(index.app, path, query, coding)
+            what = f"{path}?{query.decode()} ({coding})"
+            if status != 200 or headers.get("content-encoding", "identity") != coding:
+                problems.append(f"{what}: status {status}, content-encoding {headers.get('content-encoding')}")
+                continue
+            tag = headers["etag"].strip('"').split("-")[0]
+            name = os.path.join(dist, "data", f"{stem}.v{headers['x-data-version']}.{tag[:16]}.json{suffix}")
+            if not os.path.exists(name):
+                problems.append(f"{what}: no {name} (stale build?)")
+                continue
+            with open(name, "rb") as f:
+                static = f.read()
+            if static != body:
+                problems.append(f"{what}: {name} differs from the live response")
+            if decode(body, coding) != rendered:
+                problems.append(f"{what}: artefact body differs from the FastAPI rendering of the data file")
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the static API payloads of a build are byte-identical to the live endpoints.")
+    parser.add_argument("--dist", default="../webapp/dist")
+    parser.add_argument("--api-dir", default="../webapp/api")
+    parser.add_argument("--copy-only", action="store_true", help="only check that _snapshot.py is a copy of snapshot.py (no build needed)")
+    args = parser.parse_args()
+
+    if args.copy_only:
+        problems = snapshot_copy_problems(os.path.abspath(args.api_dir))
+        print("\n".join(problems) or "_snapshot.py is a copy of snapshot.py")
+        sys.exit(1 if problems else 0)
+
+    problems = asyncio.run(check(os.path.abspath(args.dist), os.path.abspath(args.api_dir)))
+    for problem in problems:
+        print(problem)
+    print(f"{len(STATIC_PAYLOADS) * len(SUFFIXES)} files checked, {len(problems)} problems")
+    sys.exit(1 if problems else 0)
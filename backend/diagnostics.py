@@ -0,0 +1,72 @@
+import json
+import logging
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger("wielermanager.solver")
+
+def peak_rss_mb():
+    """Peak resident memory of this process and of its waited-for children (the CBC subprocess), in MB."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+class SolveDiagnostics:
+    """
+    Wall time and memory per phase of one solve, plus free-form facts (model size, solver
+    counters). Every phase records how much it raised the peak RSS of the process
+    ("peak_rss_mb") and of solver subprocesses ("solver_peak_rss_mb"); both only grow, so a
+    phase that stays below an earlier peak shows 0. When tracemalloc is already tracing (e.g.
+    python -X tracemalloc) a phase also records the growth of traced Python memory
+    ("allocated_kb") and its peak above the start of the phase ("peak_kb"). It is not started
+    here: tracing slows the allocation-heavy model build and greedy by an order of magnitude.
+    Phases must not nest. When disabled every call is a no-op, so solve code can be
+    instrumented unconditionally.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases = []
+        self.info = {}
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            start, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        rss, child_rss = peak_rss_mb()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {"phase": name, "wall_time": time.perf_counter() - t0}
+            new_rss, new_child_rss = peak_rss_mb()
+            record["peak_rss_mb"] = new_rss - rss
+            record["solver_peak_rss_mb"] = new_child_rss - child_rss
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                record["allocated_kb"] = (current - start) / 1024
+                record["peak_kb"] = (peak - start) / 1024
+            self.phases.append(record)
+
+    def set(self, **info):
+        if self.enabled:
+            self.info.update(info)
+
+    def to_dict(self):
+        return {"phases": self.phases, "total_time": sum(p["wall_time"] for p in self.phases), **self.info}
+
+    def emit(self, **fields):
+        """One structured log record (a JSON object) for the solve."""
+        if self.enabled:
+            logger.info(json.dumps({"event": "solve_team", **fields, **self.to_dict()}, default=str))
+
+def phase_time(diagnostics: dict, *phases):
+    """Summed wall time of the named phases in a "diagnostics" block (see SolveDiagnostics.to_dict)."""
+    return sum(p["wall_time"] for p in diagnostics["phases"] if p["phase"] in phases)
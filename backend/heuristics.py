@@ -0,0 +1,134 @@
+def best_lineup(squad, race_id, points, size):
+    """The `size` highest scoring riders of the squad for one race."""
+    ranked = sorted(squad, key=lambda r: points[r].get(race_id, 0.0), reverse=True)
+    return ranked[:size]
+
+def _race_stats(squad, race_id, points, size):
+    """Points of the k-th and (k+1)-th best rider of the squad in this race (0 if missing)."""
+    vals = sorted((points[r].get(race_id, 0.0) for r in squad), reverse=True)
+    kth = vals[size - 1] if len(vals) >= size else 0.0
+    next_kth = vals[size] if len(vals) > size else 0.0
+    return kth, next_kth
+
+def _swap_gain(p_out, p_in, kth, next_kth):
+    """Change of a race's top-k total when p_out leaves the squad and p_in joins it."""
+    gain = 0.0
+    threshold = kth
+    if p_out >= kth:
+        # The leaving rider was a starter, the (k+1)-th rider moves up
+        gain -= p_out - next_kth
+        threshold = next_kth
+    return gain + max(0.0, p_in - threshold)
+
+def _plan_score(squads, C, points, size):
+    return sum(sum(points[r].get(c, 0.0) for r in best_lineup(squads[i], c, points, size)) for i, c in enumerate(C))
+
+def greedy_plan(req):
+    """
+    Builds a feasible season plan without a MILP: a greedy initial squad, improved by
+    budget-neutral swaps, then up to max_transfers single transfers chosen best-first.
+
+    Returns None when no squad fits the budget, otherwise a dict with per-race "squads" and
+    "selected" lists, the "transfers" made as (race index, rider out, rider in) and "total_points".
+    """
+    R = [r.id for r in req.riders]
+    C = [c.id for c in req.races]
+    N = len(C)
+    prices = {r.id: r.price for r in req.riders}
+    points = {r.id: r.expected_points for r in req.riders}
+    size = req.race_squad_size
+
+    if len(R) < req.team_size:
+        return None
+    cheapest = sorted(prices[r] for r in R)
+    if sum(cheapest[:req.team_size]) > req.budget:
+        return None
+
+    # 1. Initial squad: best marginal gain per price, never spending what is needed to fill the squad
+    def build_initial(by_ratio):
+        squad, spent = [], 0.0
+        pool = list(R)
+        while len(squad) < req.team_size:
+            slots_left = req.team_size - len(squad) - 1
+            cheapest = sorted(prices[r] for r in pool)
+            thresholds = [_race_stats(squad, c, points, size)[0] if len(squad) >= size else 0.0 for c in C]
+            best, best_key = None, None
+            for r in pool:
+                # The remaining slots must still be fillable with the cheapest other riders
+                if slots_left and prices[r] <= cheapest[slots_left - 1]:
+                    fill_cost = sum(cheapest[:slots_left + 1]) - prices[r]
+                else:
+                    fill_cost = sum(cheapest[:slots_left])
+                if spent + prices[r] + fill_cost > req.budget:
+                    continue
+                gain = sum(max(0.0, points[r].get(c, 0.0) - thresholds[j]) for j, c in enumerate(C))
+                key = (gain / max(prices[r], 1e-9) if by_ratio else gain, -prices[r])
+                if best_key is None or key > best_key:
+                    best, best_key = r, key
+            squad.append(best)
+            spent += prices[best]
+            pool.remove(best)
+        return squad
+
+    candidates = [build_initial(True), build_initial(False)]
+    squad = max(candidates, key=lambda s: _plan_score([s] * N, C, points, size))
+
+    # 2. Improve the initial squad with free swaps (no transfer is used before race 0)
+    improved = True
+    while improved:
+        improved = False
+        cost = sum(prices[r] for r in squad)
+        stats = [_race_stats(squad, c, points, size) for c in C]
+        members = set(squad)
+        best = (1e-9, None, None)
+        for o in squad:
+            for n in R:
+                if n in members or cost - prices[o] + prices[n] > req.budget:
+                    continue
+                gain = sum(_swap_gain(points[o].get(c, 0.0), points[n].get(c, 0.0), *stats[j]) for j, c in enumerate(C))
+                if gain > best[0]:
+                    best = (gain, o, n)
+        if best[1] is not None:
+            squad = [best[2] if r == best[1] else r for r in squad]
+            improved = True
+
+    # 3. Transfers: repeatedly apply the single swap with the best gain over the remaining races
+    squads = [list(squad) for _ in C]
+    transfers = []
+    while len(transfers) < req.max_transfers and N > 1:
+        # Fee owed at each race once one more transfer is made before it
+        made = [sum(1 for t in transfers if t[0] <= j) for j in range(N)]
+        stats = [_race_stats(squads[j], c, points, size) for j, c in enumerate(C)]
+        costs = [sum(prices[r] for r in s) for s in squads]
+        best = (1e-9, None, None, None)
+        for o in squads[-1]:
+            # o must be owned from race i to the end, so it can leave at any of those races
+            first = N - 1
+            while first > 1 and o in squads[first - 1]:
+                first -= 1
+            for n in R:
+                if any(n in squads[j] for j in range(first, N)):
+                    continue
+                delta = prices[n] - prices[o]
+                suffix = 0.0
+                for i in range(N - 1, first - 1, -1):
+                    suffix += _swap_gain(points[o].get(C[i], 0.0), points[n].get(C[i], 0.0), *stats[i])
+                    if suffix <= best[0]:
+                        continue
+                    # Squads after race i pay the new price difference plus the fee of this transfer
+                    if all(costs[j] + delta + max(0, made[j] + 1 - 3) <= req.budget for j in range(i, N)) and n not in squads[i - 1]:
+                        best = (suffix, i, o, n)
+        if best[1] is None:
+            break
+        _, i, o, n = best
+        for j in range(i, N):
+            squads[j] = [n if r == o else r for r in squads[j]]
+        transfers.append((i, o, n))
+
+    selected = [best_lineup(squads[i], c, points, size) for i, c in enumerate(C)]
+    return {
+        "squads": squads,
+        "selected": selected,
+        "transfers": sorted(transfers),
+        "total_points": sum(points[r].get(c, 0.0) for i, c in enumerate(C) for r in selected[i]),
+    }
@@ -0,0 +1,67 @@
+import math
+import random
+from solver import RANK_POINTS, Rider, Race, SolverRequest
+
+# Shape of the shipped pcs_data_v3.json: ~9 riders per team, prices 2-14 with most riders at 2-3,
+# scoring limited to the top of each race result (see load_request)
+TERRAINS = ["cobbles", "hills", "sprint"]
+RIDERS_PER_TEAM = 9
+# Sporza price -> share of the priced riders in the shipped data
+PRICE_WEIGHTS = {2: 145, 3: 109, 4: 73, 5: 23, 6: 10, 7: 6, 8: 2, 9: 1, 10: 1, 11: 1, 12: 1, 14: 2}
+
+def synthetic_request(n_riders, n_races, seed=0, scoring_depth=30, field_size=None, **kwargs):
+    """
+    Random SolverRequest shaped like the real data:
+    - riders ride for teams and have a latent strength (heavy tailed) and a favourite terrain
+    - prices follow the strength ranking, skewed to cheap riders
+    - every race has a terrain; teams enter it and pick their riders suited to that terrain,
+      so startlists overlap between races of the same terrain
+    - expected points are RANK_POINTS of the rider's rank in a noisy race result, only for the
+      top `scoring_depth` finishers (sparse, like top_ranks)
+    Extra keyword arguments (budget, max_transfers, ...) go to SolverRequest.
+    """
+    rng = random.Random(seed)
+    n_teams = max(1, math.ceil(n_riders / RIDERS_PER_TEAM))
+    strength = [rng.paretovariate(2.5) for _ in range(n_riders)]
+    terrain = [rng.choice(TERRAINS) for _ in range(n_riders)]
+    team = [r % n_teams for r in range(n_riders)]
+    # Prices drawn from the real distribution, handed out along a noisy strength ranking
+    prices = sorted(rng.choices(list(PRICE_WEIGHTS), weights=list(PRICE_WEIGHTS.values()), k=n_riders), reverse=True)
+    by_strength = sorted(range(n_riders), key=lambda r: -strength[r] * rng.lognormvariate(0, 0.3))
+    price = [0] * n_riders
+    for r, p in zip(by_strength, prices):
+        price[r] = p
+
+    roster = [[] for _ in range(n_teams)]
+    for r in range(n_riders):
+        roster[team[r]].append(r)
+
+    races = []
+    points = [{} for _ in range(n_riders)]
+    field_size = field_size or min(n_riders, 175)
+    for c in range(n_races):
+        race_id = f"race-{c}"
+        race_terrain = TERRAINS[c % len(TERRAINS)] if c % 4 else rng.choice(TERRAINS)
+        races.append(Race(id=race_id, name=f"Race {c}", date=f"2026-{3 + c * 2 // max(n_races, 1):02d}-{1 + c % 28:02d}",
+                          type="1.UWT" if rng.random() < 0.6 else "1.Pro"))
+
+        # Teams enter with up to 7 riders, specialists for the terrain first
+        starters = []
+        for t in rng.sample(range(n_teams), k=n_teams):
+            squad = sorted(roster[t], key=lambda r: (terrain[r] != race_terrain, rng.random()))
+            starters.extend(squad[:7])
+            if len(starters) >= field_size:
+                break
+        starters = starters[:field_size]
+
+        # Noisy result: strength, a bonus on the rider's terrain, and luck
+        form = {r: strength[r] * (1.6 if terrain[r] == race_terrain else 1.0) * rng.lognormvariate(0, 0.5) for r in starters}
+        result = sorted(starters, key=lambda r: -form[r])
+        for rank, r in enumerate(result[:scoring_depth], start=1):
+            points[r][race_id] = float(RANK_POINTS.get(rank, 1))
+
+    riders = [
+        Rider(id=f"rider-{r}", name=f"Rider {r}", team=f"Team {team[r]}", price=price[r], expected_points=points[r])
+        for r in range(n_riders)
+    ]
+    return SolverRequest(riders=riders, races=races, **kwargs)
@@ -0,0 +1,254 @@
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from milp_backends import INCUMBENT_RE
+from solve_cache import request_key
+
+def read_incumbents(log_path):
+    """All (objective, seconds) incumbents CBC has logged so far."""
+    try:
+        with open(log_path, "r") as f:
+            text = f.read()
+    except OSError:
+        return []
+    return [{"objective": abs(float(m.group(1))), "seconds": float(m.group(2))} for m in INCUMBENT_RE.finditer(text)]
+
+def _run_job(request_json, options, log_path, result_path):
+    """Worker process: solve and write the solution as JSON. Runs in its own process group."""
+    if hasattr(os, "setsid"):
+        # CBC is a child of this process; a new group lets cancel() stop both at once
+        os.setsid()
+    from solver import SolverRequest, solve_team
+    req = SolverRequest.model_validate_json(request_json)
+    solution = solve_team(req, log_path=log_path, **options)
+    tmp = result_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(solution, f)
+    os.replace(tmp, result_path)
+
+class SolveJob:
+    def __init__(self, req, options, key=None):
+        self.id = uuid.uuid4().hex
+        self.request_json = req.model_dump_json()
+        self.options = options
+        self.key = key  # request_key
+        self.status = "queued"  # queued -> running -> done | failed | cancelled
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.process = None
+        self.workdir = None
+
+    @property
+    def log_path(self):
+        return os.path.join(self.workdir, "cbc.log") if self.workdir else None
+
+    @property
+    def result_path(self):
+        return os.path.join(self.workdir, "solution.json") if self.workdir else None
+
+    def incumbents(self):
+        return read_incumbents(self.log_path) if self.log_path else []
+
+    def to_dict(self, with_result=True):
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "incumbents": self.incumbents(),
+            "error": self.error,
+        }
+        if with_result:
+            data["result"] = self.result
+        return data
+
+class JobQueue:
+    """
+    Bounded pool of solver processes fed from a bounded FIFO queue. Every job runs solve_team in
+    its own process, so a running solve can be cancelled by killing it, and CBC's log file gives
+    the incumbent objectives while it runs. Finished jobs are kept for `keep_finished` entries.
+
+    Identical requests (same request_key, including the data version) share one job: a
+    submission while one is queued, running or kept as done returns that job, so it never starts
+    a second solver process (cancelling the job cancels it for every submitter). With a
+    SolveCache, a request solved before that has no job any more is answered from the cache as
+    an already finished job, and solutions are stored in it.
+    """
+    def __init__(self, workers=2, max_queued=32, keep_finished=256, poll_interval=0.2, cache=None):
+        self.workers = workers
+        self.cache = cache
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        self.poll_interval = poll_interval
+        self._ctx = multiprocessing.get_context("spawn")
+        self._jobs = {}
+        self._by_key = {}  # request_key -> queued, running or done job
+        self._attached = 0
+        self._queue = deque()
+        self._running = set()
+        self._finished = deque()
+        self._busy_seconds = 0.0
+        self._started_at = time.time()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="solve-jobs", daemon=True)
+            self._thread.start()
+
+    def submit(self, req, data_version: str = "", **options):
+        """Queues a solve. Returns the job, or None when the queue is full."""
+        key = request_key(req, data_version, **options)
+        with self._lock:
+            job = self._attach(key)
+        if job is not None:
+            return job
+        cached = self.cache.lookup(key) if self.cache is not None else None
+        with self._lock:
+            # An identical request may have been submitted during the lookup
+            job = self._attach(key)
+            if job is not None:
+                return job
+            job = SolveJob(req, options, key)
+            if cached is not None:
+                job.result = cached
+                job.started = job.created
+                self._jobs[job.id] = job
+                self._by_key[key] = job
+                self._finish(job, "done")
+                return job
+            if len(self._queue) >= self.max_queued:
+                return None
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._queue.append(job)
+        self._ensure_started()
+        self._wake.set()
+        return job
+
+    def _attach(self, key):
+        # Caller holds the lock
+        job = self._by_key.get(key)
+        if job is not None:
+            self._attached += 1
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job. Returns the job (None if unknown)."""
+        process = None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ("queued", "running"):
+                return job
+            if job.status == "queued":
+                self._queue.remove(job)
+            elif job.process is not None:
+                process = job.process
+                self._kill(process)
+            self._finish(job, "cancelled")
+        self._wake.set()
+        if process is not None:
+            # Reap the killed worker without blocking get/stats/submit on the lock
+            process.join(timeout=1)
+        return job
+
+    def stats(self):
+        cache = self.cache.stats() if self.cache is not None else None
+        with self._lock:
+            now = time.time()
+            busy = self._busy_seconds + sum(now - job.started for job in self._running)
+            return {
+                "workers": self.workers,
+                "running": len(self._running),
+                "queue_depth": len(self._queue),
+                "max_queued": self.max_queued,
+                "utilization": len(self._running) / self.workers,
+                "busy_fraction": busy / max((now - self._started_at) * self.workers, 1e-9),
+                "jobs": len(self._jobs),
+                "attached": self._attached,
+                "cache": cache,
+            }
+
+    @staticmethod
+    def _kill(process):
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGKILL)
+                return
+        except (ProcessLookupError, PermissionError):
+            # The worker has not called setsid() yet
+            pass
+        process.kill()
+
+    def _finish(self, job, status):
+        # Caller holds the lock
+        job.status = status
+        job.finished = time.time()
+        if status != "done" and self._by_key.get(job.key) is job:
+            # A failed or cancelled solve is started again by the next identical request
+            del self._by_key[job.key]
+        if job in self._running:
+            self._running.discard(job)
+            self._busy_seconds += job.finished - job.started
+        self._finished.append(job)
+        while len(self._finished) > self.keep_finished:
+            old = self._finished.popleft()
+            self._jobs.pop(old.id, None)
+            if self._by_key.get(old.key) is old:
+                del self._by_key[old.key]
+            if old.workdir:
+                shutil.rmtree(old.workdir, ignore_errors=True)
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            solved = []
+            with self._lock:
+                # Reap finished processes
+                for job in list(self._running):
+                    if job.process.is_alive():
+                        continue
+                    job.process.join()
+                    try:
+                        with open(job.result_path, "r") as f:
+                            job.result = json.load(f)
+                        self._finish(job, "done")
+                        solved.append(job)
+                    except (OSError, ValueError):
+                        job.error = f"Solver process exited with code {job.process.exitcode}"
+                        self._finish(job, "failed")
+
+                # Start queued jobs while workers are free
+                while self._queue and len(self._running) < self.workers:
+                    job = self._queue.popleft()
+                    job.workdir = tempfile.mkdtemp(prefix=f"solve-{job.id[:8]}-")
+                    job.process = self._ctx.Process(
+                        target=_run_job,
+                        args=(job.request_json, job.options, job.log_path, job.result_path),
+                        daemon=True,
+                    )
+                    job.process.start()
+                    job.status = "running"
+                    job.started = time.time()
+                    self._running.add(job)
+            if self.cache is not None:
+                for job in solved:
+                    self.cache.store(job.key, job.result)
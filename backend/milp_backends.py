@@ -0,0 +1,87 @@
+import re
+import pulp
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
+
+class WarmHiGHS(pulp.HiGHS):
+    """
+    In-process HiGHS through highspy: the model goes straight from PuLP into the solver's
+    memory, with no LP/MPS file, subprocess or solution file. PuLP's HiGHS wrapper has no
+    warm start, so initial variable values are handed over with setSolution() here.
+    """
+    def __init__(self, warmStart=False, **kwargs):
+        super().__init__(**kwargs)
+        self.warmStart = warmStart
+
+    def buildSolverModel(self, lp):
+        super().buildSolverModel(lp)
+        if not self.warmStart:
+            return
+        variables = lp.variables()
+        if any(var.varValue is None for var in variables):
+            return
+        solution = highspy.HighsSolution()
+        solution.col_value = [float(var.varValue) for var in variables]
+        solution.value_valid = True
+        lp.solverModel.setSolution(solution)
+
+def available_backends():
+    backends = ["cbc"]
+    if highspy is not None:
+        backends.append("highs")
+    return backends
+
+def make_solver(backend: str = "cbc", time_limit: int = 60, warm_start: bool = False, log_path=None, preprocess: bool = True):
+    """
+    PuLP solver object for a backend name:
+    - "cbc": the bundled CBC binary (writes an MPS file, runs a subprocess, parses the solution file)
+    - "highs": HiGHS in-process through highspy (pip install highspy)
+
+    preprocess=False skips CBC's Cgl preprocessing, which costs more than it saves on small,
+    warm-started models (HiGHS ignores it).
+    """
+    if backend == "cbc":
+        options = [] if preprocess else ["preprocess off"]
+        return pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, warmStart=warm_start, logPath=log_path, options=options)
+    if backend == "highs":
+        if highspy is None:
+            raise ValueError("The highs backend needs the highspy package")
+        if log_path:
+            # output_flag must stay on for the log file; keep the console quiet instead
+            return WarmHiGHS(warmStart=warm_start, msg=True, timeLimit=time_limit, log_file=log_path, log_to_console=False)
+        return WarmHiGHS(warmStart=warm_start, msg=False, timeLimit=time_limit)
+    raise ValueError(f"Unknown MILP backend: {backend}")
+
+# CBC log lines announcing a new incumbent, e.g.
+# "Cbc0012I Integer solution of -7126 found by DiveCoefficient after 0 iterations and 0 nodes (1.15 seconds)"
+INCUMBENT_RE = re.compile(r"Integer solution of (-?[\d.e+]+) found .*\(([\d.]+) seconds\)")
+
+# Summary lines CBC writes at the end of a branch and bound run
+CBC_STATS = {
+    "nodes": re.compile(r"Enumerated nodes:\s+(\d+)"),
+    "iterations": re.compile(r"Total iterations:\s+(\d+)"),
+    "gap": re.compile(r"Gap:\s+([-\d.e+]+)"),
+}
+
+def solver_stats(backend: str, prob, log_path=None):
+    """Branch and bound node and (simplex) iteration counts and the final relative gap of the last solve."""
+    stats = {"nodes": None, "iterations": None, "gap": None}
+    if backend == "highs" and getattr(prob, "solverModel", None) is not None:
+        info = prob.solverModel.getInfo()
+        stats.update(nodes=int(info.mip_node_count), iterations=int(info.simplex_iteration_count), gap=float(info.mip_gap))
+    elif backend == "cbc" and log_path:
+        try:
+            with open(log_path, "r") as f:
+                text = f.read()
+        except OSError:
+            return stats
+        for key, pattern in CBC_STATS.items():
+            found = pattern.findall(text)
+            if found:
+                stats[key] = float(found[-1]) if key == "gap" else int(found[-1])
+        if stats["gap"] is None and "Optimal solution found" in text:
+            stats["gap"] = 0.0
+    return stats
@@ -0,0 +1,87 @@
+class PruneResult:
+    """
+    Output of prune_riders: a reduced request whose riders are class representatives,
+    the members behind every representative and a few counters for reporting.
+    """
+    def __init__(self, req, classes, stats):
+        self.req = req
+        self.classes = classes  # representative id -> list of original rider ids (representative first)
+        self.stats = stats
+
+    @property
+    def multiplicity(self):
+        return {r: len(members) for r, members in self.classes.items()}
+
+def _signature(rider, race_ids):
+    return (rider.price, tuple(rider.expected_points.get(c, 0.0) for c in race_ids))
+
+def prune_riders(req, keep=(), transfers_left=None):
+    """
+    Removes riders that can never be needed in an optimal squad and collapses riders that
+    are indistinguishable to the model (same price, same points in every race) into one class.
+
+    A rider is dominated by another rider that costs at most as much and scores at least as
+    much in every race. Over the season at most team_size - 1 + max_transfers other riders
+    share the squad with any given rider, so once team_size + max_transfers riders dominate
+    it, one of them can always take its place. Riders with a zero points vector are the
+    extreme case: they are kept only when too few cheaper riders exist to fill the squad.
+
+    Riders in `keep` (e.g. the squad a user already owns) are never pruned nor merged. When
+    `keep` is the squad owned at the start and only `transfers_left` transfers remain, any other
+    rider can only be bought, and the other transfers leave one of `transfers_left` dominating
+    riders outside `keep` unbought to take its place.
+    """
+    race_ids = [c.id for c in req.races]
+    threshold = req.team_size + req.max_transfers if transfers_left is None else transfers_left
+
+    # 1. Collapse identical signatures into symmetric classes
+    classes = {}
+    by_signature = {}
+    keep = set(keep)
+    for rider in req.riders:
+        sig = _signature(rider, race_ids)
+        if rider.id in keep:
+            # Owned riders are distinct from their class mates, give them their own signature
+            sig = sig + (rider.id,)
+        if sig in by_signature:
+            classes[by_signature[sig]].append(rider.id)
+        else:
+            by_signature[sig] = rider.id
+            classes[rider.id] = [rider.id]
+
+    # 2. Count dominating riders per class. Cheapest first, so only earlier classes can dominate.
+    reps = sorted(by_signature.items(), key=lambda item: item[0][0])
+    kept = set()
+    zero_pruned = 0
+    for sig, rep in reps:
+        price, pts = sig[:2]
+        if rep in keep:
+            kept.add(rep)
+            continue
+        dominators = 0
+        for other_sig, other_rep in reps:
+            other_price, other_pts = other_sig[:2]
+            if other_price > price:
+                break
+            if other_rep == rep or (transfers_left is not None and other_rep in keep):
+                continue
+            if all(o >= p for o, p in zip(other_pts, pts)):
+                dominators += len(classes[other_rep])
+                if dominators >= threshold:
+                    break
+        if dominators < threshold:
+            kept.add(rep)
+        elif not any(pts):
+            zero_pruned += len(classes[rep])
+
+    riders = [r for r in req.riders if r.id in kept]
+    classes = {r: members for r, members in classes.items() if r in kept}
+
+    stats = {
+        "riders_in": len(req.riders),
+        "riders_pruned": len(req.riders) - sum(len(m) for m in classes.values()),
+        "zero_points_pruned": zero_pruned,
+        "symmetric_classes": sum(1 for m in classes.values() if len(m) > 1),
+        "model_riders": len(riders),
+    }
+    return PruneResult(req.model_copy(update={"riders": riders}), classes, stats)
@@ -0,0 +1,90 @@
+import numpy as np
+from solver import RANK_POINTS, SolverRequest
+
+class SquadScorer:
+    """
+    Scores fixed squads over a riders x races points matrix. With the squad fixed, the best
+    lineup of a race is simply its `size` highest priority eligible riders, so many squads can
+    be scored at once with one sort over the squad axis.
+
+    points[r, c]    points rider r scores in race c when selected
+    eligible[r, c]  whether rider r may be selected for race c (e.g. is on the startlist)
+    priority[r, c]  lineup order, highest first (defaults to points); ties keep squad order
+    """
+    def __init__(self, rider_ids, race_ids, points, eligible=None, priority=None):
+        self.rider_ids = list(rider_ids)
+        self.race_ids = list(race_ids)
+        self.index_of = {r: i for i, r in enumerate(self.rider_ids)}
+        self.points = np.asarray(points, dtype=float).reshape(len(self.rider_ids), len(self.race_ids))
+        self.eligible = np.ones(self.points.shape, dtype=bool) if eligible is None else np.asarray(eligible, dtype=bool)
+        # When lineups follow points, totals only need the k largest values, not their order
+        self.by_points = priority is None
+        priority = self.points if priority is None else np.asarray(priority, dtype=float)
+        self.priority = np.where(self.eligible, priority, -np.inf)
+
+    @classmethod
+    def from_request(cls, req: SolverRequest):
+        """Expected points of a SolverRequest; every rider is eligible everywhere, as in the MILP."""
+        race_ids = [c.id for c in req.races]
+        points = [[r.expected_points.get(c, 0.0) for c in race_ids] for r in req.riders]
+        return cls([r.id for r in req.riders], race_ids, points)
+
+    @classmethod
+    def from_db(cls, riders, races):
+        """
+        Rows of pcs_data_v3.json: only starters are eligible, lineups follow top_ranks (unranked
+        starters last) and a ranked rider scores RANK_POINTS of its rank, like load_request.
+        """
+        race_ids = [c["id"] for c in races]
+        eligible = [[c in r.get("starts", []) for c in race_ids] for r in riders]
+        ranks = [[r.get("top_ranks", {}).get(c, 999) for c in race_ids] for r in riders]
+        points = [[RANK_POINTS.get(rank, 1) if rank != 999 else 0 for rank in row] for row in ranks]
+        return cls([r["id"] for r in riders], race_ids, points, eligible, priority=-np.array(ranks, dtype=float))
+
+    def index(self, squad_ids):
+        """Row indices of a squad given as rider ids."""
+        return np.array([self.index_of[r] for r in squad_ids], dtype=np.intp)
+
+    def score(self, squads, size=12, lineups=False, chunk=4096):
+        """
+        Scores a batch of squads, given as an (n_squads x squad_size) array of row indices.
+
+        Returns "total" (n_squads,) and "race_points" (n_squads x races); with lineups=True also
+        "lineups" (n_squads x races x size) row indices in lineup order, -1 where fewer than
+        `size` eligible riders start. Squads are processed `chunk` at a time to bound memory.
+        """
+        squads = np.atleast_2d(np.asarray(squads, dtype=np.intp))
+        n, k = len(squads), min(size, squads.shape[1])
+        race_points = np.empty((n, len(self.race_ids)))
+        chosen = np.full((n, len(self.race_ids), size), -1, dtype=np.intp) if lineups else None
+        for lo in range(0, n, chunk):
+            block = squads[lo:lo + chunk]
+            if self.by_points and not lineups:
+                top = np.partition(self.priority[block], squads.shape[1] - k, axis=1)[:, -k:, :]
+                race_points[lo:lo + chunk] = np.where(np.isfinite(top), top, 0.0).sum(axis=1)
+                continue
+            # (squads, races, members): stable sort keeps squad order between equal priorities
+            order = np.argsort(-self.priority[block].transpose(0, 2, 1), axis=2, kind="stable")[:, :, :k]
+            members = np.take_along_axis(np.broadcast_to(block[:, None, :], order.shape[:2] + block.shape[1:]), order, axis=2)
+            races = np.arange(len(self.race_ids))[None, :, None]
+            ok = self.eligible[members, races]
+            race_points[lo:lo + chunk] = np.where(ok, self.points[members, races], 0.0).sum(axis=2)
+            if lineups:
+                chosen[lo:lo + chunk, :, :k] = np.where(ok, members, -1)
+        result = {"total": race_points.sum(axis=1), "race_points": race_points}
+        if lineups:
+            result["lineups"] = chosen
+        return result
+
+    def lineup(self, squad_ids, size=12):
+        """One squad by rider ids: per race its selected rider ids and points, plus the total."""
+        result = self.score(self.index(squad_ids)[None, :], size, lineups=True)
+        races = [
+            {
+                "race_id": c,
+                "selected": [self.rider_ids[r] for r in result["lineups"][0, j] if r >= 0],
+                "points": float(result["race_points"][0, j]),
+            }
+            for j, c in enumerate(self.race_ids)
+        ]
+        return {"total_points": float(result["total"][0]), "races": races}
@@ -1,8 +1,8 @@
 import cloudscraper
 from bs4 import BeautifulSoup
-import json
 import time
 import re
+from snapshot import write_database
 
 def get_points_for_rank(rank):
     # #1 has more weight than #2 and #3, etc.
@@ -191,11 +191,10 @@ def scrape():
     print("\n--- FINAL SCORED SQUAD ---")
     print(f"Total riders with points: {len(scored_riders)}")
 
-    with open('../webapp/api/pcs_data_v3.json', 'w') as f:
-        json.dump({
-            "riders": scored_riders,
-            "races": races
-        }, f, indent=2)
+    write_database({
+        "riders": scored_riders,
+        "races": races
+    }, '../webapp/api/pcs_data_v3.json')
         
     print("Scraping complete. Saved to ../webapp/api/pcs_data_v3.json.")
 
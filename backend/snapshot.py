@@ -0,0 +1,627 @@
+import base64
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Quality 11 is ~15x slower than 9 for ~15% smaller bodies: too slow for a cold start, so it is
+# only used for the prebuilt artefact (see write_artefact)
+BROTLI_QUALITY = 9
+ARTEFACT_BROTLI_QUALITY = 11
+
+def dumps(obj):
+    """JSON bytes exactly as FastAPI's JSONResponse renders them."""
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def accepted_encodings(accept_encoding: str):
+    """Content codings a client accepts (q > 0) from its Accept-Encoding header."""
+    accepted = set()
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+class Payload:
+    """
+    A response body rendered once per snapshot, with a strong ETag (a hash of the body) and its
+    gzip and brotli encodings, each compressed on first use. Encoded bodies get the ETag with an
+    encoding suffix, since they are different byte sequences of the same resource; the brotli
+    suffix includes the quality ("-br9"), as each quality gives different bytes.
+    """
+    def __init__(self, body: bytes, media_type: str = "application/json", vary: str = "Accept-Encoding", headers=None,
+                 tag=None, encoded=None, brotli_quality: int = BROTLI_QUALITY):
+        self.body = body
+        self.media_type = media_type
+        self.vary = vary
+        self.headers = headers or {}
+        self.tag = tag or hashlib.sha256(body).hexdigest()[:32]
+        self.brotli_quality = brotli_quality
+        self._encoded = {**(encoded or {}), "identity": body}
+        self._lock = threading.Lock()
+
+    def encoded(self, coding: str) -> bytes:
+        if coding not in self._encoded:
+            with self._lock:
+                if coding not in self._encoded:
+                    if coding == "br":
+                        self._encoded[coding] = brotli.compress(self.body, quality=self.brotli_quality)
+                    else:
+                        self._encoded[coding] = gzip.compress(self.body, 9, mtime=0)
+        return self._encoded[coding]
+
+    def etag(self, coding: str = "identity") -> str:
+        if coding == "identity":
+            return f'"{self.tag}"'
+        return f'"{self.tag}-br{self.brotli_quality}"' if coding == "br" else f'"{self.tag}-{coding}"'
+
+    def render(self, if_none_match: str = "", accept_encoding: str = "", cache_control: str = "no-cache"):
+        """
+        (status, body, headers) for a GET: 304 with an empty body when If-None-Match lists any
+        encoding of this body, else 200 with the best encoding the client accepts.
+        """
+        accepted = accepted_encodings(accept_encoding)
+        coding = "br" if brotli is not None and "br" in accepted else "gzip" if "gzip" in accepted else "identity"
+        headers = {"ETag": self.etag(coding), "Vary": self.vary, "Cache-Control": cache_control, **self.headers}
+        if if_none_match:
+            tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+            if "*" in tags or tags & {self.etag(c) for c in ("identity", "gzip", "br")}:
+                return 304, b"", headers
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return 200, self.encoded(coding), headers
+
+# Media type of the columnar rider encoding (see encode_columnar)
+COLUMNAR_MEDIA_TYPE = "application/vnd.wielermanager.columnar+json"
+
+# Columnar encodings of the rider fields whose values repeat; other fields are plain columns
+COLUMNAR_FIELDS = {
+    "team": "dict",  # index into dictionaries[field]
+    "team_logo": "dict",
+    "historic_results": "dict_list",  # list of indices into dictionaries[field]
+    "starts": "race_list",  # list of indices into races
+    "top_ranks": "race_map",  # flat [race index, rank, race index, rank, ...]
+    "expertises": "map_columns",  # one dense column per key
+}
+
+def _fits(encoding, value):
+    if encoding == "dict":
+        return isinstance(value, str)
+    if encoding in ("dict_list", "race_list"):
+        return isinstance(value, list) and all(isinstance(v, str) for v in value)
+    if encoding == "race_map":
+        return isinstance(value, dict)
+    if encoding == "map_columns":
+        return isinstance(value, dict) and None not in value.values()
+    return True
+
+def encode_columnar(riders, race_ids=()):
+    """
+    Encodes rider objects column by column. Race ids are interned in "races" (race_ids first,
+    in order), repeated strings in "dictionaries"; riders lacking a field are listed per field
+    in "absent". Fields keep the order in which they first appear, and decode_columnar (or the
+    dashboard's decodeColumnar) restores the objects exactly, with their fields in that order.
+    A field is left plain when a value does not fit its encoding in COLUMNAR_FIELDS.
+    """
+    fields = list(dict.fromkeys(k for r in riders for k in r))
+    races = {c: j for j, c in enumerate(race_ids)}
+    intern = lambda table, value: table.setdefault(value, len(table))
+    encodings, columns, dictionaries, absent = [], {}, {}, {}
+    for field in fields:
+        values = [r.get(field) for r in riders]
+        missing = [i for i, r in enumerate(riders) if field not in r]
+        present = [v for r, v in zip(riders, values) if field in r]
+        encoding = COLUMNAR_FIELDS.get(field, "plain")
+        if not all(_fits(encoding, v) for v in present):
+            encoding = "plain"
+        if encoding == "dict":
+            table = {}
+            columns[field] = [None if field not in r else intern(table, v) for r, v in zip(riders, values)]
+            dictionaries[field] = list(table)
+        elif encoding == "dict_list":
+            table = {}
+            columns[field] = [[intern(table, x) for x in v] if field in r else None for r, v in zip(riders, values)]
+            dictionaries[field] = list(table)
+        elif encoding == "race_list":
+            columns[field] = [[intern(races, c) for c in v] if field in r else None for r, v in zip(riders, values)]
+        elif encoding == "race_map":
+            columns[field] = [[x for c, rank in v.items() for x in (intern(races, c), rank)] if field in r else None
+                              for r, v in zip(riders, values)]
+        elif encoding == "map_columns":
+            keys = list(dict.fromkeys(k for v in present for k in v))
+            columns[field] = {k: [v.get(k) if v is not None else None for v in values] for k in keys}
+        else:
+            columns[field] = values
+        encodings.append([field, encoding])
+        if missing:
+            absent[field] = missing
+    return {
+        "format": "columnar",
+        "count": len(riders),
+        "fields": encodings,
+        "races": list(races),
+        "dictionaries": dictionaries,
+        "columns": columns,
+        "absent": absent,
+    }
+
+def decode_columnar(doc):
+    """The rider objects of an encode_columnar document."""
+    races, dictionaries, columns = doc["races"], doc["dictionaries"], doc["columns"]
+    absent = {field: set(rows) for field, rows in doc["absent"].items()}
+    riders = [{} for _ in range(doc["count"])]
+    for field, encoding in doc["fields"]:
+        column, skip = columns[field], absent.get(field, ())
+        for i, r in enumerate(riders):
+            if i in skip:
+                continue
+            if encoding == "dict":
+                r[field] = dictionaries[field][column[i]]
+            elif encoding == "dict_list":
+                r[field] = [dictionaries[field][x] for x in column[i]]
+            elif encoding == "race_list":
+                r[field] = [races[j] for j in column[i]]
+            elif encoding == "race_map":
+                r[field] = {races[column[i][k]]: column[i][k + 1] for k in range(0, len(column[i]), 2)}
+            elif encoding == "map_columns":
+                r[field] = {k: values[i] for k, values in column.items() if values[i] is not None}
+            else:
+                r[field] = column[i]
+    return riders
+
+def wants_columnar(format_param, accept: str) -> bool:
+    """Whether a request asks for the columnar rider encoding: ?format=columnar or its media type in Accept."""
+    if format_param is not None:
+        if format_param not in ("json", "columnar"):
+            raise ValueError(f"Unknown format: {format_param}")
+        return format_param == "columnar"
+    return COLUMNAR_MEDIA_TYPE in (accept or "")
+
+# Orders of the riders query (see RiderIndex), as the dashboard names them
+RIDER_SORTS = ("score_desc", "roi_desc", "budget_desc", "budget_asc", "race_desc")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+class RiderIndex:
+    """
+    Indexes over one snapshot's riders for filtered, sorted and paginated queries, with the
+    dashboard's semantics: a case-insensitive name substring, an exact team, a maximum price
+    (no price counts as 0), an optional race the rider starts, and the sort orders of
+    RIDER_SORTS with ties in database order (race_desc: best top-competitor rank first,
+    unranked riders last).
+
+    Every order is a precomputed list of rider positions with its inverse (the place of each
+    rider in it). Name, team and starter filters give candidate sets (names through an index of
+    their 1- to 3-letter substrings), which are intersected, checked and sorted by their place
+    in the order; without them the order is walked from the cursor until the page is full.
+
+    lineups[race] holds the race's starters best top-competitor rank first (999 when unranked,
+    ties in database order), with lineup_places[race] the place of each starter in it; a race's
+    best riders of any squad then come from looking up the squad's riders.
+    """
+    GRAM = 3
+
+    def __init__(self, riders, races, digest: str = ""):
+        self.riders = riders
+        self.digest = digest
+        n = len(riders)
+        self.price = [r.get("sporza_price") or 0 for r in riders]
+        self.names = [(r.get("name") or "").lower() for r in riders]
+        self.race_ids = [c["id"] for c in races]
+        self.orders = {
+            "score_desc": sorted(range(n), key=lambda i: -(riders[i].get("global_score") or 0)),
+            "roi_desc": sorted(range(n), key=lambda i: -(riders[i].get("roi") or 0)),
+            "budget_desc": sorted(range(n), key=lambda i: -self.price[i]),
+            "budget_asc": sorted(range(n), key=lambda i: self.price[i]),
+        }
+        for c in self.race_ids:
+            self.orders[c] = sorted(range(n), key=lambda i: riders[i].get("top_ranks", {}).get(c) or 999)
+        self.places = {key: self._inverse(order) for key, order in self.orders.items()}
+        self.sorted_prices = [self.price[i] for i in self.orders["budget_asc"]]
+
+        self.positions = {r["id"]: i for i, r in enumerate(riders)}
+        self.teams = {}
+        self.starters = {c: set() for c in self.race_ids}
+        self.grams = {}
+        for i, r in enumerate(riders):
+            self.teams.setdefault(r.get("team"), set()).add(i)
+            for c in r.get("starts", []):
+                self.starters.setdefault(c, set()).add(i)
+            name = self.names[i]
+            for k in range(1, self.GRAM + 1):
+                for j in range(len(name) - k + 1):
+                    self.grams.setdefault(name[j:j + k], set()).add(i)
+        self.lineups = {
+            c: sorted(self.starters[c], key=lambda i: (riders[i].get("top_ranks", {}).get(c, 999), i))
+            for c in self.race_ids
+        }
+        self.lineup_places = {c: {i: p for p, i in enumerate(lineup)} for c, lineup in self.lineups.items()}
+
+    @staticmethod
+    def _inverse(order):
+        place = [0] * len(order)
+        for p, i in enumerate(order):
+            place[i] = p
+        return place
+
+    def _name_candidates(self, term: str):
+        """Riders whose name contains every 3-letter (or shorter) piece of term: a superset of the matches."""
+        k = min(len(term), self.GRAM)
+        sets = [self.grams.get(term[j:j + k], set()) for j in range(len(term) - k + 1)]
+        return set.intersection(*sorted(sets, key=len))
+
+    def lineup(self, race_id: str, squad=None, size: int = 12):
+        """Rider ids of the best `size` starters of a race, among the rider positions in squad when given."""
+        if squad is None:
+            picked = self.lineups[race_id][:size]
+        else:
+            places = self.lineup_places[race_id]
+            picked = sorted((i for i in squad if i in places), key=places.__getitem__)[:size]
+        return [self.riders[i]["id"] for i in picked]
+
+    def encode_cursor(self, key: str, place: int) -> str:
+        return base64.urlsafe_b64encode(f"{self.digest[:16]}|{key}|{place}".encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str, key: str) -> int:
+        """Place in the order after which the page starts. ValueError for a cursor of another query or data version."""
+        try:
+            version, cursor_key, place = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+            place = int(place)
+        except ValueError as e:
+            raise ValueError("Invalid cursor") from e
+        if version != self.digest[:16] or cursor_key != key:
+            raise ValueError("Cursor is from another query or data version")
+        return place
+
+    def query(self, q=None, team=None, max_budget=None, starting=None, sort="score_desc", race=None,
+              limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        One page of riders: {"items", "total", "next_cursor"}. next_cursor (None on the last page)
+        continues the same query while the snapshot is current. Raises ValueError on bad input.
+        """
+        if sort not in RIDER_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        if sort == "race_desc" and race is None:
+            raise ValueError("sort=race_desc needs a race")
+        if sort == "race_desc" and race not in self.race_ids:
+            raise ValueError(f"Unknown race: {race}")
+        if starting is not None and starting not in self.starters:
+            raise ValueError(f"Unknown race: {starting}")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        key = race if sort == "race_desc" else sort
+        order, place = self.orders[key], self.places[key]
+        after = self.decode_cursor(cursor, key) if cursor else -1
+
+        term = q.lower() if q and q.strip() else None
+        sets = []
+        if team is not None:
+            sets.append(self.teams.get(team, set()))
+        if starting is not None:
+            sets.append(self.starters[starting])
+        if term is not None:
+            sets.append(self._name_candidates(term))
+
+        def ok(i):
+            return (max_budget is None or self.price[i] <= max_budget) and (term is None or term in self.names[i])
+
+        if sets:
+            first, *rest = sorted(sets, key=len)
+            matches = sorted((place[i] for i in first if all(i in s for s in rest) and ok(i)))
+            total = len(matches)
+            start = bisect.bisect_right(matches, after)
+            page = [order[p] for p in matches[start:start + limit + 1]]
+        else:
+            total = len(order) if max_budget is None else bisect.bisect_right(self.sorted_prices, max_budget)
+            p = after + 1
+            if max_budget is not None and sort == "budget_desc":
+                # Skip straight past the riders above the budget
+                p = max(p, len(order) - total)
+            page = []
+            while p < len(order) and len(page) <= limit:
+                if ok(order[p]):
+                    page.append(order[p])
+                p += 1
+        more = len(page) > limit
+        page = page[:limit]
+        return {
+            "items": [self.riders[i] for i in page],
+            "total": total,
+            "next_cursor": self.encode_cursor(key, place[page[-1]]) if more else None,
+        }
+
+class Snapshot:
+    """
+    One loaded version of the rider database. Snapshots are never modified after loading: the
+    riders and races lists are shared by all requests that picked this snapshot and must be
+    treated as read-only. Derived values (serialised responses, indexes) are built at most once
+    per snapshot with cached().
+
+    version and changes are the data version and change log kept by write_database (0 and
+    empty for a file written without it). prebuilt holds payloads loaded from the artefact of
+    the same file (see load_artefact), used instead of rendering them again.
+    """
+    def __init__(self, riders, races, digest: str = "", mtime_ns: int = 0, size: int = 0,
+                 version: int = 0, changes=None, prebuilt=None):
+        self.riders = riders
+        self.races = races
+        self.digest = digest
+        self.version = version
+        self.changes = changes or {}
+        self.prebuilt = prebuilt or {}
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.loaded_at = time.time()
+        self._cache = {}
+        # Reentrant: a cached value may be built from another one (e.g. a response from the index)
+        self._lock = threading.RLock()
+
+    @property
+    def riders_json(self) -> bytes:
+        # Rendered on first use only: with an artefact the full payloads are prebuilt
+        return self.cached("riders_json", lambda: dumps(self.riders))
+
+    @property
+    def races_json(self) -> bytes:
+        return self.cached("races_json", lambda: dumps(self.races))
+
+    def changes_since(self, since: int):
+        """
+        Races and riders whose tracked fields (see TRACKED_FIELDS) changed after data version
+        `since`, in database order, and the ids removed since. ValueError unless 0 <= since <= version.
+        """
+        if not 0 <= since <= self.version:
+            raise ValueError(f"since must be between 0 and the current version {self.version}")
+
+        def log():
+            # Per kind: (version, id) sorted, so a query is a bisection plus the tail
+            return {
+                key: sorted((v, i) for i, v in entries.items())
+                for key, entries in [(kind, self.changes.get(kind, {})) for kind in TRACKED_FIELDS]
+                + [(("removed", kind), self.changes.get("removed", {}).get(kind, {})) for kind in TRACKED_FIELDS]
+            }
+
+        index = self.cached("change_log", log)
+        positions = self.cached("positions", lambda: {
+            kind: {x["id"]: j for j, x in enumerate(getattr(self, kind))} for kind in TRACKED_FIELDS
+        })
+        tail = lambda key: [i for _, i in index[key][bisect.bisect_right(index[key], (since, chr(0x10FFFF))):]]
+        result = {"version": self.version, "since": since}
+        for kind in TRACKED_FIELDS:
+            rows = sorted(positions[kind][i] for i in tail(kind) if i in positions[kind])
+            result[kind] = [getattr(self, kind)[j] for j in rows]
+        result["removed"] = {kind: sorted(tail(("removed", kind))) for kind in TRACKED_FIELDS}
+        return result
+
+    def rider_index(self) -> RiderIndex:
+        return self.cached("rider_index", lambda: RiderIndex(self.riders, self.races, self.digest))
+
+    def payload(self, key, build_body, **kwargs):
+        """
+        The Payload of build_body() (bytes), built once per snapshot and key; kwargs go to Payload.
+        It carries the data version in X-Data-Version, the starting point for /api/changes.
+        """
+        if key in self.prebuilt:
+            return self.prebuilt[key]
+        headers = {"X-Data-Version": str(self.version)}
+        return self.cached(("payload", key), lambda: Payload(build_body(), headers=headers, **kwargs))
+
+    def riders_payload(self, columnar: bool = False) -> Payload:
+        """All riders, as JSON or in the columnar encoding."""
+        if columnar:
+            race_ids = [c["id"] for c in self.races]
+            return self.payload("riders_columnar", lambda: dumps(encode_columnar(self.riders, race_ids)),
+                                media_type=COLUMNAR_MEDIA_TYPE, vary="Accept, Accept-Encoding")
+        return self.payload("riders", lambda: self.riders_json, vary="Accept, Accept-Encoding")
+
+    def races_payload(self) -> Payload:
+        return self.payload("races", lambda: self.races_json)
+
+    def cached(self, key, build):
+        """build() once per snapshot and key; concurrent callers wait for the first."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = build()
+            return self._cache[key]
+
+def artefact_path_for(path: str) -> str:
+    """Where write_artefact puts the artefact of a data file."""
+    return os.path.splitext(path)[0] + ".artefact"
+
+def write_artefact(path: str, artefact_path=None):
+    """
+    Prebuilds the riders, columnar riders and races payloads of a data file with every encoding
+    (brotli at ARTEFACT_BROTLI_QUALITY when available) into one file: a JSON header line with
+    the data file's sha256, the payload metadata and the offset of every body, then the bodies.
+    A server answers those endpoints from it without parsing the data (see load_artefact).
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    snap = Snapshot(data.get("riders", []), data.get("races", []), hashlib.sha256(raw).hexdigest(),
+                    version=data.get("version", 0))
+    payloads = {"riders": snap.riders_payload(), "riders_columnar": snap.riders_payload(True), "races": snap.races_payload()}
+    header = {"source": snap.digest, "version": snap.version, "payloads": {}}
+    bodies, offset = [], 0
+    for key, payload in payloads.items():
+        payload = Payload(payload.body, payload.media_type, payload.vary, payload.headers, payload.tag,
+                          brotli_quality=ARTEFACT_BROTLI_QUALITY)
+        parts = {"identity": payload.body, "gzip": payload.encoded("gzip")}
+        if brotli is not None:
+            parts["br"] = payload.encoded("br")
+        header["payloads"][key] = {"media_type": payload.media_type, "vary": payload.vary, "headers": payload.headers,
+                                   "tag": payload.tag, "brotli_quality": payload.brotli_quality, "parts": {}}
+        for coding, body in parts.items():
+            header["payloads"][key]["parts"][coding] = [offset, len(body)]
+            bodies.append(body)
+            offset += len(body)
+    artefact_path = artefact_path or artefact_path_for(path)
+    tmp = f"{artefact_path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(dumps(header) + b"\n")
+        f.writelines(bodies)
+    os.replace(tmp, artefact_path)
+
+def load_artefact(path: str, digest: str):
+    """The prebuilt payloads of an artefact ({key: Payload}), or None when it is missing or not of the data with this sha256."""
+    try:
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            body = f.read()
+    except (OSError, ValueError):
+        return None
+    if header.get("source") != digest:
+        return None
+    payloads = {}
+    for key, meta in header["payloads"].items():
+        parts = {coding: body[offset:offset + length] for coding, (offset, length) in meta["parts"].items()}
+        # Without a prebuilt brotli body it is compressed on first use, at the runtime quality
+        quality = meta["brotli_quality"] if "br" in parts else BROTLI_QUALITY
+        payloads[key] = Payload(parts.pop("identity"), meta["media_type"], meta["vary"], meta["headers"], meta["tag"], parts,
+                                quality)
+    return payloads
+
+# Fields whose changes write_database records per race and rider, for /api/changes
+TRACKED_FIELDS = {
+    "races": ("actual_results", "is_completed"),
+    "riders": ("sporza_price", "top_ranks"),
+}
+
+def write_database(data, path: str):
+    """
+    Writes the database for every producer (scraper, price mapper, results job). Compared with
+    the file on disk, a race or rider that is new or whose TRACKED_FIELDS differ is stamped in
+    data["changes"] with the new data["version"] (one more than on disk), removed ones under
+    data["changes"]["removed"]. Nothing is written when riders and races are unchanged. The file
+    is replaced atomically, so readers see the old or the new version, never a partial one, and
+    its artefact (see write_artefact) is rebuilt. Returns the version of the file.
+    """
+    try:
+        with open(path, "r") as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = {}
+    if old.get("riders") == data.get("riders") and old.get("races") == data.get("races"):
+        return old.get("version", 0)
+
+    version = old.get("version", 0) + 1
+    changes = old.get("changes", {})
+    removed = changes.setdefault("removed", {})
+    for kind, fields in TRACKED_FIELDS.items():
+        stamps, gone = changes.setdefault(kind, {}), removed.setdefault(kind, {})
+        before = {x["id"]: x for x in old.get(kind, [])}
+        for x in data.get(kind, []):
+            prev = before.pop(x["id"], None)
+            if prev is None or any(prev.get(f) != x.get(f) for f in fields):
+                stamps[x["id"]] = version
+                gone.pop(x["id"], None)
+        for i in before:
+            gone[i] = version
+            stamps.pop(i, None)
+
+    data = {**data, "version": version, "changes": changes}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+    write_artefact(path)
+    return version
+
+class SnapshotStore:
+    """
+    Process-wide holder of the current Snapshot of a JSON data file. A call stats the file and
+    only reads it when its mtime or size changed, and only parses it when the content hash
+    changed too (e.g. a checkout that touched the file). The new snapshot replaces the old one
+    with a single reference assignment, so a request that took a snapshot keeps a consistent
+    view while a reload happens. When the file cannot be read the previous snapshot is kept
+    (an empty one before the first successful load).
+
+    With an artefact_path, prebuilt() serves the artefact's payloads for the current file
+    without parsing it at all; get() parses on first use and reuses them.
+    """
+    def __init__(self, path: str, artefact_path=None):
+        self.path = path
+        self.artefact_path = artefact_path
+        self._current = None
+        self._stat = None
+        self._digest = None
+        self._raw = None  # read but not parsed yet
+        self._prebuilt = None
+        self._lock = threading.Lock()
+
+    def _refresh(self, parse: bool):
+        try:
+            st = os.stat(self.path)
+            stat = (st.st_mtime_ns, st.st_size)
+        except OSError as e:
+            stat, error = None, e
+        if stat is not None and stat == self._stat and not (parse and self._raw is not None):
+            return
+        with self._lock:
+            if stat is None:
+                if self._current is None:
+                    print(f"Warning: Could not load {self.path}.", error)
+                    self._current = Snapshot([], [])
+                self._stat = None
+                return
+            if stat != self._stat:
+                try:
+                    with open(self.path, "rb") as f:
+                        raw = f.read()
+                except OSError as e:
+                    print(f"Warning: Could not load {self.path}.", e)
+                    return
+                digest = hashlib.sha256(raw).hexdigest()
+                if digest != self._digest:
+                    self._digest, self._raw = digest, raw
+                    self._prebuilt = load_artefact(self.artefact_path, digest) if self.artefact_path else None
+                self._stat = stat
+            if parse and self._raw is not None:
+                try:
+                    data = json.loads(self._raw)
+                except ValueError as e:
+                    # Possibly caught mid-write: keep serving the previous snapshot and retry on the next call
+                    print(f"Warning: Could not load {self.path}.", e)
+                    self._stat = None
+                    if self._current is None:
+                        self._current = Snapshot([], [])
+                    return
+                self._current = Snapshot(data.get("riders", []), data.get("races", []), self._digest, *self._stat,
+                                         version=data.get("version", 0), changes=data.get("changes"),
+                                         prebuilt=self._prebuilt)
+                self._raw = None
+
+    def get(self) -> Snapshot:
+        self._refresh(parse=True)
+        return self._current
+
+    def prebuilt(self):
+        """The artefact payloads of the current file ({key: Payload}), or None without a matching artefact."""
+        self._refresh(parse=False)
+        return self._prebuilt
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Rebuild the prebuilt payload artefact of a data file.")
+    parser.add_argument("db", nargs="?", default="../webapp/api/pcs_data_v3.json")
+    args = parser.parse_args()
+    write_artefact(args.db)
+    print(f"Wrote {artefact_path_for(args.db)} ({os.path.getsize(artefact_path_for(args.db))} bytes)")
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from solver import SolverRequest, solve_team
+
+# Bump when the model or the solution schema changes, so stale on-disk entries are ignored
+SOLVER_VERSION = 1
+
+def request_key(req: SolverRequest, data_version: str = "", **options):
+    """
+    Canonical hash of everything that influences the solve. Rider names and teams are left out,
+    riders are sorted by id and zero point entries dropped, so cosmetic differences share a key.
+    Race order is kept: it is the calendar.
+    """
+    riders = sorted(
+        [r.id, float(r.price), sorted((c, float(p)) for c, p in r.expected_points.items() if p)]
+        for r in req.riders
+    )
+    payload = {
+        "solver_version": SOLVER_VERSION,
+        "data_version": data_version,
+        "riders": riders,
+        "races": [c.id for c in req.races],
+        "max_transfers": req.max_transfers,
+        "budget": float(req.budget),
+        "team_size": req.team_size,
+        "race_squad_size": req.race_squad_size,
+        "options": sorted(options.items()),
+    }
+    blob = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+class SolveCache:
+    """
+    Content-addressed cache in front of solve_team: an in-memory LRU tier, an optional
+    on-disk tier (one JSON file per key) and in-flight deduplication, so concurrent
+    identical requests wait for a single solve. Returned solutions are shared between
+    callers and must be treated as read-only. Solvers that run elsewhere (the JobQueue's
+    processes) use lookup and store with a request_key instead of solve.
+    """
+    def __init__(self, maxsize=128, cache_dir=None, solve=solve_team):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.solve_fn = solve
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.inflight_joins = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "inflight_joins": self.inflight_joins,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, solution):
+        if not self.cache_dir:
+            return
+        # Write to a temp file first so readers never see a half written entry
+        tmp = f"{self._disk_path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(solution, f)
+        os.replace(tmp, self._disk_path(key))
+
+    def _remember(self, key, solution):
+        self._entries[key] = solution
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def lookup(self, key):
+        """The cached solution for a key, from memory or disk, or None."""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        solution = self._read_disk(key)
+        with self._lock:
+            if solution is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, solution)
+        return solution
+
+    def store(self, key, solution):
+        """Keeps a solution computed for a key (failed solves are not kept)."""
+        if "error" in solution:
+            return
+        self._write_disk(key, solution)
+        with self._lock:
+            self._remember(key, solution)
+
+    def solve(self, req: SolverRequest, data_version: str = "", **options):
+        key = request_key(req, data_version, **options)
+
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = Future()
+                self._inflight[key] = pending
+            else:
+                self.inflight_joins += 1
+        if not owner:
+            # Someone else is already solving this exact request
+            return pending.result()
+
+        try:
+            solution = self._read_disk(key)
+            with self._lock:
+                if solution is not None:
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+            if solution is None:
+                solution = self.solve_fn(req, **options)
+                # Failed solves (time limit, infeasible) are not worth keeping
+                if "error" not in solution:
+                    self._write_disk(key, solution)
+            with self._lock:
+                if "error" not in solution:
+                    self._remember(key, solution)
+                del self._inflight[key]
+            pending.set_result(solution)
+            return solution
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
+            raise
@@ -1,6 +1,17 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 import pulp
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+from presolve import prune_riders
+from heuristics import greedy_plan, best_lineup
+from milp_backends import make_solver, solver_stats
+from diagnostics import SolveDiagnostics
 
 class Rider(BaseModel):
     id: str
@@ -23,7 +34,67 @@ class SolverRequest(BaseModel):
     team_size: int = 20
     race_squad_size: int = 12
 
-def solve_team(req: SolverRequest):
+class TeamHistory(BaseModel):
+    race_id: str
+    team: List[str]
+    selected: List[str] = []  # defaults to the best 12 of the team
+
+# Sporza-style weighting of a top-competitor rank, mirrors scrape_pcs_v3.get_points_for_rank
+RANK_POINTS = {
+    1: 100, 2: 80, 3: 70, 4: 60, 5: 50,
+    6: 45,  7: 40, 8: 35, 9: 30, 10: 25,
+    11: 20, 12: 18, 13: 16, 14: 14, 15: 12,
+    16: 10, 17: 9, 18: 8, 19: 7, 20: 6
+}
+
+def request_from_data(data, include_unpriced=False, **kwargs):
+    """
+    Builds a SolverRequest from the scraped database (the parsed pcs_data_v3.json). Expected
+    points per race are the weighted top-competitor ranks (they sum to the rider's global_score).
+    Riders without a Sporza price are not buyable in the game and are skipped, unless
+    include_unpriced is set (they then cost 0, e.g. to score a squad that already owns them).
+    """
+    riders = []
+    for r in data.get("riders", []):
+        if not r.get("sporza_price") and not include_unpriced:
+            continue
+        riders.append(Rider(
+            id=r["id"],
+            name=r.get("name", r["id"]),
+            team=r.get("team", "Unknown"),
+            price=r.get("sporza_price") or 0,
+            expected_points={c: float(RANK_POINTS.get(rank, 1)) for c, rank in r.get("top_ranks", {}).items()},
+        ))
+    races = [Race(id=c["id"], name=c["name"], date=c["date"], type=c.get("class", "")) for c in data.get("races", [])]
+    return SolverRequest(riders=riders, races=races, **kwargs)
+
+def load_request(db_file="../webapp/api/pcs_data_v3.json", **kwargs):
+    """request_from_data for a database file."""
+    with open(db_file, "r") as f:
+        data = json.load(f)
+    return request_from_data(data, **kwargs)
+
+def model_size(prob):
+    """Returns (rows, columns, nonzeros) of a built PuLP model."""
+    rows = len(prob.constraints)
+    cols = len(prob.variables())
+    nonzeros = sum(len(con) for con in prob.constraints.values())
+    return rows, cols, nonzeros
+
+def build_model(req: SolverRequest, multiplicity: Optional[Dict[str, int]] = None,
+                initial_team: Optional[Dict[str, int]] = None, transfers_used: int = 0):
+    """
+    Builds the season MILP. Returns the problem and a dict with its variables.
+
+    Cumulative transfers are carried by one counter per race (cum[c] = cum[prev] + transfers at c)
+    instead of re-summing every earlier transfer_in, so the fee rows stay O(riders) each.
+
+    multiplicity maps a rider id to the size of its symmetric class (see presolve.prune_riders);
+    the variables of such a rider count how many class members are owned/selected/transferred.
+
+    initial_team (rider id -> count) is the squad owned before the first race of req.races. When
+    given, the first race also allows transfers, counted on top of transfers_used earlier ones.
+    """
     # Setup problem
     prob = pulp.LpProblem("Wielermanager_Optimization", pulp.LpMaximize)
 
@@ -32,6 +103,10 @@ def solve_team(req: SolverRequest):
     C = [c.id for c in req.races]
     N = len(C)
 
+    # Races preceded by a transfer window
+    T = C if initial_team is not None else C[1:]
+    transfers_left = max(0, req.max_transfers - transfers_used)
+
     # Dictionaries for quick lookup
     prices = {r.id: r.price for r in req.riders}
     points = {r.id: r.expected_points for r in req.riders}
@@ -43,96 +118,179 @@ def solve_team(req: SolverRequest):
     # selected[r][c] = 1 if rider r is in the 12-man starting squad for race c
     selected = pulp.LpVariable.dicts("selected", (R, C), cat="Binary")
     
-    # transfer_in[r][c] = 1 if rider r is transferred IN just before race c (c >= 1)
-    transfer_in = pulp.LpVariable.dicts("transfer_in", (R, C[1:]), cat="Binary")
+    # transfer_in[r][c] = 1 if rider r is transferred IN just before race c
+    transfer_in = pulp.LpVariable.dicts("transfer_in", (R, T), cat="Binary")
     
-    # transfer_out[r][c] = 1 if rider r is transferred OUT just before race c (c >= 1)
-    transfer_out = pulp.LpVariable.dicts("transfer_out", (R, C[1:]), cat="Binary")
+    # transfer_out[r][c] = 1 if rider r is transferred OUT just before race c
+    transfer_out = pulp.LpVariable.dicts("transfer_out", (R, T), cat="Binary")
+
+    # Symmetric classes become general integers bounded by the class size
+    multiplicity = multiplicity or {}
+    for r, m in multiplicity.items():
+        if m <= 1:
+            continue
+        m = min(m, req.team_size)
+        for var_dict in (in_team, selected, transfer_in, transfer_out):
+            for var in var_dict[r].values():
+                var.cat = pulp.LpInteger
+                var.upBound = m
 
-    # fees[c] = total transfer fees paid up to race c
-    fees = pulp.LpVariable.dicts("fees", C, lowBound=0, cat="Continuous")
+    # cum_transfers[c] = number of transfers made up to and including race c
+    cum_transfers = pulp.LpVariable.dicts("cum_transfers", T, lowBound=0, upBound=transfers_left, cat="Continuous")
+
+    # fees[c] = total transfer fees paid up to race c (no fee before the first transfer window)
+    fees = pulp.LpVariable.dicts("fees", T, lowBound=0, cat="Continuous")
 
     # Objective: maximize expected points of selected riders across all races
     prob += pulp.lpSum(points[r].get(c, 0.0) * selected[r][c] for r in R for c in C), "TotalExpectedPoints"
 
-    # Constraints for Race 0 (Initial Squad)
-    c0 = C[0]
-    prob += pulp.lpSum(in_team[r][c0] for r in R) == req.team_size, "Initial_Team_Size"
-    prob += pulp.lpSum(prices[r] * in_team[r][c0] for r in R) <= req.budget, "Initial_Budget"
-    prob += pulp.lpSum(selected[r][c0] for r in R) == req.race_squad_size, f"Squad_Size_{c0}"
-    for r in R:
-        prob += selected[r][c0] <= in_team[r][c0], f"Must_own_{r}_{c0}"
-
-    # No transfers before Race 0, so fee[c0] = 0
-    prob += fees[c0] == 0, "Fee_Initial"
+    # Rows whose right-hand side follows the request parameters (patched by ModelTemplate)
+    rows = {"team_size": [], "squad_size": [], "budget": [], "class_swap": []}
 
-    # Constraints for subsequent races
-    for i in range(1, N):
-        prev_c = C[i-1]
-        curr_c = C[i]
+    for i, curr_c in enumerate(C):
+        prev_c = C[i-1] if i > 0 else None
 
-        # 1. Total team size is still 20
-        prob += pulp.lpSum(in_team[r][curr_c] for r in R) == req.team_size, f"Team_Size_{curr_c}"
+        # 1. Total team size is 20 (together with the evolution rows this already forces IN == OUT)
+        row = pulp.lpSum(in_team[r][curr_c] for r in R) == req.team_size
+        prob += row, f"Team_Size_{curr_c}" if curr_c in fees else "Initial_Team_Size"
+        rows["team_size"].append(row)
 
         # 2. Total active squad size is 12
-        prob += pulp.lpSum(selected[r][curr_c] for r in R) == req.race_squad_size, f"Squad_Size_{curr_c}"
+        row = pulp.lpSum(selected[r][curr_c] for r in R) == req.race_squad_size
+        prob += row, f"Squad_Size_{curr_c}"
+        rows["squad_size"].append(row)
 
-        # Transfers balance: IN must equal OUT
-        prob += pulp.lpSum(transfer_in[r][curr_c] for r in R) == pulp.lpSum(transfer_out[r][curr_c] for r in R), f"Transfer_Balance_{curr_c}"
+        current_team_cost = pulp.lpSum(prices[r] * in_team[r][curr_c] for r in R)
+        if curr_c not in fees:
+            # Initial squad, nothing transferred yet
+            row = current_team_cost <= req.budget
+            prob += row, "Initial_Budget"
+            rows["budget"].append(row)
+            for r in R:
+                prob += selected[r][curr_c] <= in_team[r][curr_c], f"Must_own_{r}_{curr_c}"
+            continue
 
-        # Calculate cumulated transfers logically up to this race
-        cum_transfers = pulp.lpSum(transfer_in[r][c] for r in R for c in C[1:i+1])
+        # Cumulated transfers up to this race
+        transfers_now = pulp.lpSum(transfer_in[r][curr_c] for r in R)
+        if prev_c in cum_transfers:
+            prob += cum_transfers[curr_c] == cum_transfers[prev_c] + transfers_now, f"Cum_Transfers_{curr_c}"
+        else:
+            prob += cum_transfers[curr_c] == transfers_now, f"Cum_Transfers_{curr_c}"
 
-        # Fees calculation (Fee = max(0, cum_transfers - 3))
-        prob += fees[curr_c] >= 0, f"Fee_Positive_{curr_c}"
-        prob += fees[curr_c] >= cum_transfers - 3, f"Fee_Formula_{curr_c}"
+        # Fees calculation (Fee = max(0, cum_transfers - 3)), the lower bound of fees covers the 0 side
+        prob += fees[curr_c] >= cum_transfers[curr_c] + transfers_used - 3, f"Fee_Formula_{curr_c}"
 
         # Budget constraint at this race
-        current_team_cost = pulp.lpSum(prices[r] * in_team[r][curr_c] for r in R)
-        prob += current_team_cost + fees[curr_c] <= req.budget, f"Budget_{curr_c}"
+        row = current_team_cost + fees[curr_c] <= req.budget
+        prob += row, f"Budget_{curr_c}"
+        rows["budget"].append(row)
 
         for r in R:
             # Cannot select unowned riders
             prob += selected[r][curr_c] <= in_team[r][curr_c], f"Must_own_{r}_{curr_c}"
 
-            # Ownership evolution
-            prob += in_team[r][curr_c] == in_team[r][prev_c] + transfer_in[r][curr_c] - transfer_out[r][curr_c], f"Evolution_{r}_{curr_c}"
+            # Ownership evolution. With binary in_team this already forbids buying an owned
+            # rider or selling an unowned one; the row below only rules out a same-rider in+out.
+            owned_before = in_team[r][prev_c] if prev_c is not None else initial_team.get(r, 0)
+            prob += in_team[r][curr_c] == owned_before + transfer_in[r][curr_c] - transfer_out[r][curr_c], f"Evolution_{r}_{curr_c}"
+            row = transfer_in[r][curr_c] + transfer_out[r][curr_c] <= min(multiplicity.get(r, 1), req.team_size)
+            prob += row, f"No_Swap_Back_{r}_{curr_c}"
+            if multiplicity.get(r, 1) > 1:
+                rows["class_swap"].append((r, row))
 
-            # Can only transfer in if not already in team
-            prob += transfer_in[r][curr_c] <= 1 - in_team[r][prev_c], f"Max_Transfer_In_{r}_{curr_c}"
+    # The global max transfers constraint is the upper bound of cum_transfers
 
-            # Can only transfer out if currently in team
-            prob += transfer_out[r][curr_c] <= in_team[r][prev_c], f"Max_Transfer_Out_{r}_{curr_c}"
+    variables = {
+        "in_team": in_team,
+        "selected": selected,
+        "transfer_in": transfer_in,
+        "transfer_out": transfer_out,
+        "cum_transfers": cum_transfers,
+        "fees": fees,
+        "rows": rows,
+    }
+    return prob, variables
 
-    # Global Max Transfers constraint
-    prob += pulp.lpSum(transfer_in[r][c] for r in R for c in C[1:]) <= req.max_transfers, "Max_Global_Transfers"
+def _seed_variables(req: SolverRequest, v, classes: Dict[str, List[str]], squads, lineups):
+    """
+    Writes a per-race plan (lists of original rider ids) into the model variables as initial
+    values. Returns False, leaving the variables untouched, when the plan uses a rider the
+    model does not know (e.g. one pruned away).
+    """
+    rep_of = {m: r for r, ms in classes.items() for m in ms}
+    if any(m not in rep_of for squad in list(squads) + list(lineups) for m in squad):
+        return False
 
-    # Solve the problem
-    prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=60))
+    C = [c.id for c in req.races]
+    prev = None
+    made = 0
+    for i, c in enumerate(C):
+        owned = {r: 0 for r in classes}
+        starting = {r: 0 for r in classes}
+        for m in squads[i]:
+            owned[rep_of[m]] += 1
+        for m in lineups[i]:
+            starting[rep_of[m]] += 1
+        for r in classes:
+            v["in_team"][r][c].setInitialValue(owned[r])
+            v["selected"][r][c].setInitialValue(starting[r])
+            if i > 0:
+                v["transfer_in"][r][c].setInitialValue(max(0, owned[r] - prev[r]))
+                v["transfer_out"][r][c].setInitialValue(max(0, prev[r] - owned[r]))
+        if i > 0:
+            made += sum(max(0, owned[r] - prev[r]) for r in classes)
+            v["cum_transfers"][c].setInitialValue(made)
+            v["fees"][c].setInitialValue(max(0, made - 3))
+        prev = owned
+    return True
 
-    if pulp.LpStatus[prob.status] != "Optimal":
-        return {"status": pulp.LpStatus[prob.status], "error": "Could not find optimal solution"}
+def set_warm_start(req: SolverRequest, v, classes: Dict[str, List[str]], incumbent=None):
+    """
+    Seeds the model variables with a known solution (`incumbent`, in the solve_team output
+    schema, e.g. from a neighbouring request) or else with a greedy plan built over the riders
+    of `classes`. Returns the seeded plan (None when nothing feasible was found).
+    """
+    if incumbent is not None and "races" in incumbent:
+        squads = [race["team"] for race in incumbent["races"]]
+        lineups = [race["selected"] for race in incumbent["races"]]
+        if len(squads) == len(req.races) and _seed_variables(req, v, classes, squads, lineups):
+            return incumbent
 
-    # Extract results
-    solution = {
-        "status": "Optimal",
-        "total_points": pulp.value(prob.objective),
-        "races": []
-    }
+    members = {m for ms in classes.values() for m in ms}
+    plan = greedy_plan(req.model_copy(update={"riders": [r for r in req.riders if r.id in members]}))
+    if plan is None or not _seed_variables(req, v, classes, plan["squads"], plan["selected"]):
+        return None
+    return plan
 
-    # For each race, extract the 20-man team and 12-man starting lineup
-    for i, c in enumerate(C):
-        race_team = [r for r in R if pulp.value(in_team[r][c]) == 1]
-        race_selected = [r for r in R if pulp.value(selected[r][c]) == 1]
-        
-        team_cost = sum(prices[r] for r in race_team)
-        fee_paid = pulp.value(fees[c])
-        remaining_budget = req.budget - team_cost - fee_paid
-        
-        transfers_in = [r for r in R if i > 0 and pulp.value(transfer_in[r][c]) == 1]
-        transfers_out = [r for r in R if i > 0 and pulp.value(transfer_out[r][c]) == 1]
-
-        solution["races"].append({
+def build_solution(req: SolverRequest, classes: Dict[str, List[str]], owned, starting,
+                   initial_team: Optional[Dict[str, int]] = None, transfers_used: int = 0):
+    """
+    Turns per-race class counts (owned[i][rep], starting[i][rep]) into the per-race solution schema.
+    A class owning k members maps back to its first k original rider ids.
+    """
+    prices = {r.id: r.price for r in req.riders}
+    points = {r.id: r.expected_points for r in req.riders}
+    prev_owned = initial_team
+    made = transfers_used
+    races = []
+    total_points = 0.0
+    for i, c in enumerate(r.id for r in req.races):
+        race_team = [m for r, k in owned[i].items() for m in classes[r][:k]]
+        race_selected = [m for r, k in starting[i].items() for m in classes[r][:k]]
+        total_points += sum(points[m].get(c, 0.0) for m in race_selected)
+
+        transfers_in, transfers_out = [], []
+        if prev_owned is not None:
+            for r in classes:
+                before, after = prev_owned.get(r, 0), owned[i].get(r, 0)
+                transfers_in += classes[r][before:after]
+                transfers_out += classes[r][after:before]
+        made += len(transfers_in)
+        prev_owned = owned[i]
+
+        team_cost = sum(prices[m] for m in race_team)
+        fee_paid = max(0, made - 3)
+        races.append({
             "race_id": c,
             "team": race_team,
             "selected": race_selected,
@@ -140,7 +298,354 @@ def solve_team(req: SolverRequest):
             "transfers_out": transfers_out,
             "budget_used": team_cost,
             "fees_paid": fee_paid,
-            "remaining_budget": remaining_budget
+            "remaining_budget": req.budget - team_cost - fee_paid
         })
+    return {"status": "Optimal", "total_points": total_points, "races": races}
+
+class ModelTemplate:
+    """
+    A built exact model for one rider/price/race structure. Requests sharing that structure
+    only differ in budget, max_transfers, team_size, race_squad_size and expected points, which
+    patch() writes into the existing objective, right-hand sides and bounds. Hold `lock` from
+    patch() until the solution is extracted: the PuLP objects are shared.
+    """
+    def __init__(self, req: SolverRequest, multiplicity: Dict[str, int]):
+        self.multiplicity = multiplicity
+        self.prob, self.v = build_model(req, multiplicity)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(req: SolverRequest, multiplicity: Dict[str, int]):
+        payload = [
+            [(r.id, float(r.price), multiplicity.get(r.id, 1)) for r in req.riders],
+            [c.id for c in req.races],
+        ]
+        return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def patch(self, req: SolverRequest):
+        v, rows = self.v, self.v["rows"]
+        selected = v["selected"]
+        self.prob.setObjective(pulp.LpAffineExpression(
+            (selected[r.id][c.id], r.expected_points.get(c.id, 0.0)) for r in req.riders for c in req.races
+        ))
+        for row in rows["team_size"]:
+            row.changeRHS(req.team_size)
+        for row in rows["squad_size"]:
+            row.changeRHS(req.race_squad_size)
+        for row in rows["budget"]:
+            row.changeRHS(req.budget)
+        for var in v["cum_transfers"].values():
+            var.upBound = req.max_transfers
+
+        # Class sizes are capped by the team size
+        for r, m in self.multiplicity.items():
+            if m > 1:
+                for var_dict in (v["in_team"], selected, v["transfer_in"], v["transfer_out"]):
+                    for var in var_dict[r].values():
+                        var.upBound = min(m, req.team_size)
+        for r, row in rows["class_swap"]:
+            row.changeRHS(min(self.multiplicity[r], req.team_size))
+
+        # Drop values of the previous solve, they must not leak into a warm start
+        for var in self.prob.variables():
+            var.varValue = None
+
+# Built templates, most recently used last
+_TEMPLATES = OrderedDict()
+_TEMPLATES_LOCK = threading.Lock()
+MAX_TEMPLATES = 8
+
+def get_template(req: SolverRequest, multiplicity: Dict[str, int]):
+    key = ModelTemplate.key(req, multiplicity)
+    with _TEMPLATES_LOCK:
+        template = _TEMPLATES.get(key)
+        if template is not None:
+            _TEMPLATES.move_to_end(key)
+            return template
+    template = ModelTemplate(req, multiplicity)
+    with _TEMPLATES_LOCK:
+        template = _TEMPLATES.setdefault(key, template)
+        _TEMPLATES.move_to_end(key)
+        while len(_TEMPLATES) > MAX_TEMPLATES:
+            _TEMPLATES.popitem(last=False)
+    return template
+
+def counts(var_dict, R, c):
+    """Per rider class in R, its rounded value of var_dict[r][c] in a solved model (owned or starting counts in race c)."""
+    # varValue directly: pulp.value() dispatches per call and dominated the extract phase
+    return {r: int(round(var_dict[r][c].varValue or 0)) for r in R}
+
+# Pseudo races standing in for blocks of races after the rolling window
+TAIL_ID = "aggregated-tail"
+
+def _tail_blocks(tail: List[str], block: int):
+    """Splits the races after the window into blocks, each represented by one pseudo race."""
+    return {f"{TAIL_ID}-{k}": tail[i:i + block] for k, i in enumerate(range(0, len(tail), block))}
+
+def _add_tail(prob, v, req: SolverRequest, blocks: Dict[str, List[str]]):
+    """
+    Values the squad owned at each tail stage over the races of its block. The squad stays fixed
+    within a block and the per-race lineups are relaxed to continuous variables, so the tail
+    only adds easy LP columns next to the detailed window.
+    """
+    R = [r.id for r in req.riders]
+    points = {r.id: r.expected_points for r in req.riders}
+    tail = [c for races in blocks.values() for c in races]
+    lineup = pulp.LpVariable.dicts("tail_selected", (R, tail), lowBound=0, cat="Continuous")
+    for stage, races in blocks.items():
+        for c in races:
+            prob += pulp.lpSum(lineup[r][c] for r in R) <= req.race_squad_size, f"Tail_Squad_Size_{c}"
+            for r in R:
+                prob += lineup[r][c] <= v["in_team"][r][stage], f"Tail_Must_own_{r}_{c}"
+    prob.setObjective(prob.objective + pulp.lpSum(points[r].get(c, 0.0) * lineup[r][c] for r in R for c in tail))
+
+def _solve_rolling(req: SolverRequest, multiplicity: Dict[str, int], window: int, backend: str = "cbc",
+                   time_limit: int = 60, log_path: Optional[str] = None):
+    """
+    Rolling horizon: optimise `window` upcoming races in detail, aggregate the later races into
+    blocks of `window` races that each keep one squad (see _add_tail), fix the squad and lineup
+    of the first race, then slide one race forward. Returns per-race (owned, starting) counts or
+    a failed status.
+    """
+    C = [c.id for c in req.races]
+    R = [r.id for r in req.riders]
+    owned, starting = [], []
+    current, used = None, 0
+    for t in range(len(C)):
+        blocks = _tail_blocks(C[t + window:], window)
+        horizon = req.races[t:t + window] + [Race(id=stage, name="Aggregated tail", date="", type="tail") for stage in blocks]
+        sub = req.model_copy(update={"races": horizon})
+
+        prob, v = build_model(sub, multiplicity, initial_team=current, transfers_used=used)
+        _add_tail(prob, v, req, blocks)
+        prob.solve(make_solver(backend, time_limit, log_path=log_path))
+        if pulp.LpStatus[prob.status] != "Optimal":
+            return pulp.LpStatus[prob.status], None, None
+
+        # Fix the first decision and move on
+        decided = counts(v["in_team"], R, C[t])
+        owned.append(decided)
+        starting.append(counts(v["selected"], R, C[t]))
+        if current is not None:
+            used += sum(max(0, decided[r] - current.get(r, 0)) for r in R)
+        current = decided
+    return "Optimal", owned, starting
+
+def solve_relaxation(prob, backend: str = "cbc", time_limit: int = 60):
+    """
+    Solves the LP relaxation of a built model in place: variable values and reduced costs (dj)
+    are left on the variables, their categories are restored. Returns the LP optimum (None if
+    the relaxation did not solve).
+    """
+    variables = prob.variables()
+    cats = [var.cat for var in variables]
+    for var in variables:
+        var.cat = pulp.LpContinuous
+    try:
+        prob.solve(make_solver(backend, time_limit))
+    finally:
+        for var, cat in zip(variables, cats):
+            var.cat = cat
+    if pulp.LpStatus[prob.status] != "Optimal":
+        return None
+    return pulp.value(prob.objective) or 0.0
+
+def _solve_exact(prob, v, req: SolverRequest, classes: Dict[str, List[str]], warm_start: bool, incumbent=None,
+                 backend: str = "cbc", time_limit: int = 60, log_path: Optional[str] = None,
+                 lp_bound: bool = False, diag: Optional[SolveDiagnostics] = None):
+    """
+    Solves a built exact model. Returns (status, owned, starting, lp) where lp holds the bound of
+    the LP relaxation, solved first when lp_bound is set, else None. Phases and solver counters
+    are recorded on diag when given.
+    """
+    diag = diag or SolveDiagnostics(enabled=False)
+    lp = None
+    if lp_bound:
+        t0 = time.perf_counter()
+        with diag.phase("lp_relaxation"):
+            bound = solve_relaxation(prob, backend, time_limit)
+        lp = {"bound": bound, "lp_time": time.perf_counter() - t0}
+
+    # Hand the solver a greedy (or given) incumbent so it starts pruning from the first node
+    with diag.phase("warm_start"):
+        plan = set_warm_start(req, v, classes, incumbent) if warm_start else None
+
+
+    # CBC only reports its node and iteration counts in the log
+    solve_log = log_path
+    if diag.enabled and backend == "cbc" and log_path is None:
+        fd, solve_log = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+
+    # Solve the problem
+    try:
+        with diag.phase("solve"):
+            prob.solve(make_solver(backend, time_limit, warm_start=plan is not None, log_path=solve_log))
+        if diag.enabled:
+            diag.set(solver=solver_stats(backend, prob, solve_log))
+    finally:
+        if solve_log != log_path:
+            os.remove(solve_log)
+    status = pulp.LpStatus[prob.status]
+    if status != "Optimal":
+        return status, None, None, lp
+
+    # For each race, extract the 20-man team and 12-man starting lineup
+    with diag.phase("extract"):
+        R = list(classes)
+        C = [c.id for c in req.races]
+        owned = [counts(v["in_team"], R, c) for c in C]
+        starting = [counts(v["selected"], R, c) for c in C]
+    return status, owned, starting, lp
+
+def solve_team(req: SolverRequest, prune: bool = True, warm_start: bool = True, mode: str = "exact", window: int = 4,
+               reuse_model: bool = False, incumbent: Optional[dict] = None, time_limit: int = 60,
+               log_path: Optional[str] = None, backend: str = "cbc", lp_bound: bool = False, diagnostics: bool = False):
+    """
+    mode="exact" solves the whole season as one MILP. mode="rolling" solves a sliding
+    window of `window` races with an aggregated tail (see _solve_rolling), which scales to long
+    calendars at the price of optimality.
+
+    reuse_model=True keeps the built exact model per rider/price/race set (see ModelTemplate)
+    and only patches the objective and right-hand sides for later requests.
+
+    incumbent is a feasible solution of an earlier, more constrained request (same schema as
+    the return value); when it fits the model it replaces the greedy warm start.
+
+    backend picks the MILP solver (see milp_backends.make_solver). log_path, when given,
+    receives the solver log (the CBC log is used to follow incumbents of a running solve).
+
+    lp_bound=True (exact mode) solves the LP relaxation first and reports its optimum as the
+    "bound", the "gap" of the solution to it and the LP time under "lp".
+
+    diagnostics=True adds a "diagnostics" block (see diagnostics.SolveDiagnostics): wall time and
+    memory growth per phase, the model dimensions and presolve counters, the solver's node and iteration counts
+    and the final gap. The same block is logged as one JSON record on "wielermanager.solver".
+    """
+    diag = SolveDiagnostics(diagnostics)
+    # Drop dominated riders and collapse identical ones before building the model
+    with diag.phase("presolve"):
+        if prune:
+            pruned = prune_riders(req)
+            model_req, classes = pruned.req, pruned.classes
+        else:
+            pruned = None
+            model_req, classes = req, {r.id: [r.id] for r in req.riders}
+        multiplicity = {r: len(m) for r, m in classes.items()}
+
+    lp = None
+    if mode == "rolling":
+        # One phase for all windows; solver counters are not collected per window
+        with diag.phase("rolling"):
+            status, owned, starting = _solve_rolling(model_req, multiplicity, window, backend, time_limit, log_path)
+    elif mode == "exact" and reuse_model:
+        # Same structure as an earlier request: only patch coefficients and right-hand sides
+        with diag.phase("patch"):
+            template = get_template(model_req, multiplicity)
+        with template.lock:
+            template.patch(model_req)
+            if diagnostics:
+                diag.set(model=dict(zip(("rows", "columns", "nonzeros"), model_size(template.prob))))
+            status, owned, starting, lp = _solve_exact(template.prob, template.v, req, classes, warm_start, incumbent,
+                                                       backend, time_limit, log_path, lp_bound, diag)
+    elif mode == "exact":
+        with diag.phase("build"):
+            prob, v = build_model(model_req, multiplicity)
+        if diagnostics:
+            diag.set(model=dict(zip(("rows", "columns", "nonzeros"), model_size(prob))))
+        status, owned, starting, lp = _solve_exact(prob, v, req, classes, warm_start, incumbent,
+                                                   backend, time_limit, log_path, lp_bound, diag)
+    else:
+        raise ValueError(f"Unknown solve mode: {mode}")
+
+    if status != "Optimal":
+        solution = {"status": status, "error": "Could not find optimal solution"}
+    else:
+        with diag.phase("build_solution"):
+            solution = build_solution(req, classes, owned, starting)
+        if pruned:
+            solution["presolve"] = pruned.stats
+        if lp and lp["bound"]:
+            solution["bound"] = lp["bound"]
+            solution["gap"] = max(0.0, (lp["bound"] - solution["total_points"]) / lp["bound"])
+            solution["lp"] = lp
+    if diagnostics:
+        diag.set(mode=mode, backend=backend, riders=len(req.riders), races=len(req.races))
+        if pruned:
+            diag.set(presolve=pruned.stats)
+        solution["diagnostics"] = diag.to_dict()
+        diag.emit(status=solution["status"], total_points=solution.get("total_points"))
+    return solution
+
+def resolve_team(req: SolverRequest, history: List[TeamHistory], prune: bool = True, backend: str = "cbc"):
+    """
+    Mid-season re-optimisation. `history` holds the squad actually fielded at each completed
+    race, in calendar order from the first race. Those races are frozen: the transfers and fees
+    they used are carried over and only the remaining races are solved, starting from the last
+    fielded squad (which also serves as the warm start: keeping it is always feasible).
+    """
+    C = [c.id for c in req.races]
+    done = len(history)
+    if [h.race_id for h in history] != C[:done]:
+        raise ValueError("history must cover the first races of the calendar, in order")
+
+    known = {r.id for r in req.riders}
+    for h in history:
+        unknown = [m for m in h.team + h.selected if m not in known]
+        if unknown:
+            raise ValueError(f"Unknown riders in history of {h.race_id}: {unknown}")
+        if len(set(h.team)) != len(h.team) or len(h.team) != req.team_size:
+            raise ValueError(f"Team of {h.race_id} must be {req.team_size} distinct riders, got {len(h.team)}")
+        if len(set(h.selected)) != len(h.selected) or len(h.selected) > req.race_squad_size:
+            raise ValueError(f"Lineup of {h.race_id} must be at most {req.race_squad_size} distinct riders")
+        outside = [m for m in h.selected if m not in h.team]
+        if outside:
+            raise ValueError(f"Lineup of {h.race_id} has riders outside its team: {outside}")
+
+    # Completed races, reported as they were fielded
+    points = {r.id: r.expected_points for r in req.riders}
+    past_owned = [{m: 1 for m in h.team} for h in history]
+    past_starting = [{m: 1 for m in (h.selected or best_lineup(h.team, h.race_id, points, req.race_squad_size))} for h in history]
+    past_req = req.model_copy(update={"races": req.races[:done]})
+    solution = build_solution(past_req, {r: [r] for r in known}, past_owned, past_starting)
+    used = sum(len(race["transfers_in"]) for race in solution["races"])
+
+    if done == len(C):
+        return solution
+
+    # Remaining horizon, starting from the last fielded squad
+    future_req = req.model_copy(update={"races": req.races[done:]})
+    current = past_owned[-1] if history else None
+    if prune:
+        pruned = prune_riders(future_req, keep=current or (),
+                              transfers_left=max(0, req.max_transfers - used) if current else None)
+        model_req, classes = pruned.req, pruned.classes
+        solution["presolve"] = pruned.stats
+    else:
+        model_req, classes = future_req, {r.id: [r.id] for r in future_req.riders}
+    R = [r.id for r in model_req.riders]
+    F = [c.id for c in future_req.races]
+
+    prob, v = build_model(model_req, {r: len(m) for r, m in classes.items()}, initial_team=current, transfers_used=used)
+    if current is not None:
+        for c in F:
+            kept = best_lineup(list(current), c, points, req.race_squad_size)
+            for r in R:
+                v["in_team"][r][c].setInitialValue(current.get(r, 0))
+                v["selected"][r][c].setInitialValue(1 if r in kept else 0)
+                v["transfer_in"][r][c].setInitialValue(0)
+                v["transfer_out"][r][c].setInitialValue(0)
+            v["cum_transfers"][c].setInitialValue(0)
+            v["fees"][c].setInitialValue(max(0, used - 3))
+    prob.solve(make_solver(backend, warm_start=current is not None, preprocess=current is None))
+
+    if pulp.LpStatus[prob.status] != "Optimal":
+        return {"status": pulp.LpStatus[prob.status], "error": "Could not find optimal solution"}
 
+    future = build_solution(future_req, classes,
+                            [counts(v["in_team"], R, c) for c in F],
+                            [counts(v["selected"], R, c) for c in F],
+                            initial_team=current, transfers_used=used)
+    solution["total_points"] += future["total_points"]
+    solution["races"] += future["races"]
     return solution
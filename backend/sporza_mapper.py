@@ -2,6 +2,7 @@ import json
 import cloudscraper
 from unidecode import unidecode
 from thefuzz import fuzz
+from snapshot import write_database
 
 def normalize_name(name):
     # Remove accents, lowercase, replace hyphens with spaces
@@ -99,9 +100,8 @@ def map_sporza_prices():
     print(f"Sample of missing riders: {missing[:10]}")
     
     # 4. Save updated DB
-    with open(db_file, "w") as f:
-        json.dump(data, f, indent=2)
-    print("Database updated.")
+    version = write_database(data, db_file)
+    print(f"Database updated (data version {version}).")
 
 if __name__ == "__main__":
     map_sporza_prices()
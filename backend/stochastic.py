@@ -0,0 +1,196 @@
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pulp
+from milp_backends import make_solver
+from presolve import prune_riders
+from solver import RANK_POINTS, Race, SolverRequest, build_model, build_solution, load_request, set_warm_start, solve_team, counts
+
+def sample_scenarios(req: SolverRequest, n: int, seed: int = 0, spread: float = 2.0, dnf: float = 0.1):
+    """
+    Samples n race outcomes: points[s, r, c] for scenario s, rider r (req.riders order) and race
+    c (req.races order). The favourites of a race are the riders with expected points in it;
+    their finishing order is Plackett-Luce with weights expected_points ** spread (a large
+    spread follows the expected order, a small one gives more upsets), each favourite drops out
+    with probability `dnf`, and finishers score RANK_POINTS of their realised rank (1 beyond 20,
+    as in load_request).
+    """
+    rng = np.random.default_rng(seed)
+    points = np.zeros((n, len(req.riders), len(req.races)), dtype=np.float32)
+    for c, race in enumerate(req.races):
+        field = np.array([i for i, r in enumerate(req.riders) if r.expected_points.get(race.id, 0.0) > 0], dtype=np.intp)
+        if not len(field):
+            continue
+        weights = np.array([req.riders[i].expected_points[race.id] for i in field])
+        # Gumbel-max trick: sorting log-weights plus Gumbel noise samples a Plackett-Luce order
+        keys = spread * np.log(weights)[None, :] + rng.gumbel(size=(n, len(field)))
+        keys[rng.random((n, len(field))) < dnf] = -np.inf
+        order = np.argsort(-keys, axis=1)
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(field) + 1)[None, :], axis=1)
+        table = np.array([0.0] + [RANK_POINTS.get(k, 1) for k in range(1, len(field) + 1)])
+        points[:, field, c] = np.where(np.isfinite(keys), table[ranks], 0.0)
+    return points
+
+def scenario_totals(req: SolverRequest, solution, points):
+    """Season points of a solution (solve_team schema) in every scenario."""
+    index = {r.id: i for i, r in enumerate(req.riders)}
+    race_index = {c.id: j for j, c in enumerate(req.races)}
+    totals = np.zeros(len(points))
+    for race in solution["races"]:
+        rows = [index[m] for m in race["selected"]]
+        totals += points[:, rows, race_index[race["race_id"]]].sum(axis=1, dtype=np.float64)
+    return totals
+
+def cvar(totals, alpha):
+    """Mean of the worst ceil(alpha * n) scenario totals."""
+    k = max(1, math.ceil(alpha * len(totals)))
+    return float(np.sort(totals)[:k].mean())
+
+def _scenario_request(req: SolverRequest, points):
+    """
+    The request with one pseudo race per (scenario, race), used only for pruning: a rider is then
+    dominated when another is cheaper and scores at least as much in every race of every scenario.
+    """
+    races = [Race(id=f"{s}|{c.id}", name=c.name, date=c.date, type=c.type) for s in range(len(points)) for c in req.races]
+    riders = [
+        r.model_copy(update={"expected_points": {
+            f"{s}|{c.id}": float(points[s, i, j]) for s in range(len(points)) for j, c in enumerate(req.races) if points[s, i, j]
+        }})
+        for i, r in enumerate(req.riders)
+    ]
+    return req.model_copy(update={"riders": riders, "races": races})
+
+def _solve_batch(req: SolverRequest, points, alpha: float, time_limit: int, backend: str):
+    """
+    CVaR season MILP over one batch of scenarios: maximise eta - sum(u_s) / (alpha * n) with
+    u_s >= eta - Z_s, the sample CVaR of the scenario totals Z_s. Returns a solution or None.
+    """
+    pruned = prune_riders(_scenario_request(req, points))
+    keep = set(pruned.classes)
+    model_req = req.model_copy(update={"riders": [r for r in req.riders if r.id in keep]})
+    prob, v = build_model(model_req, pruned.multiplicity)
+    R = [r.id for r in model_req.riders]
+    C = [c.id for c in req.races]
+    rows = {r.id: i for i, r in enumerate(req.riders)}
+    n = len(points)
+
+    eta = pulp.LpVariable("eta")
+    shortfall = pulp.LpVariable.dicts("shortfall", range(n), lowBound=0)
+    totals = [
+        pulp.lpSum(float(points[s, rows[r], j]) * v["selected"][r][c] for r in R for j, c in enumerate(C) if points[s, rows[r], j])
+        for s in range(n)
+    ]
+    for s in range(n):
+        prob += shortfall[s] >= eta - totals[s], f"Shortfall_{s}"
+    prob.setObjective(eta - pulp.lpSum(shortfall.values()) * (1.0 / (alpha * n)))
+
+    # Greedy warm start, with eta and the shortfalls that go with it
+    plan = set_warm_start(req, v, pruned.classes)
+    if plan is not None:
+        plan_totals = [sum(points[s, rows[m], j] for j in range(len(C)) for m in plan["selected"][j]) for s in range(n)]
+        var = sorted(plan_totals)[max(1, math.ceil(alpha * n)) - 1]
+        eta.setInitialValue(var)
+        for s in range(n):
+            shortfall[s].setInitialValue(max(0.0, var - plan_totals[s]))
+
+    prob.solve(make_solver(backend, time_limit, warm_start=plan is not None))
+    if pulp.LpStatus[prob.status] != "Optimal":
+        return None
+    owned = [counts(v["in_team"], R, c) for c in C]
+    starting = [counts(v["selected"], R, c) for c in C]
+    return build_solution(req, pruned.classes, owned, starting)
+
+def solve_scenarios(req: SolverRequest, n: int = 200, objective: str = "cvar", alpha: float = 0.2, batch_size: int = 25,
+                    seed: int = 0, workers=None, time_limit: int = 60, backend: str = "cbc", spread: float = 2.0, dnf: float = 0.1):
+    """
+    Scenario-based squad optimisation over n sampled outcomes (see sample_scenarios).
+
+    objective="expected" maximises the sample mean, which is linear: it is the deterministic
+    model with the mean points per rider and race, solved once.
+
+    objective="cvar" maximises the mean of the worst alpha share of scenario totals. One MILP
+    over all n scenarios grows by a dense row per scenario, so the scenarios are split into
+    batches of batch_size; every batch's CVaR problem is solved on a process pool, the
+    expected-value plan is added, and each candidate plan is scored on all n scenarios. The
+    candidate with the best full-sample CVaR is returned (a decomposition heuristic: its value
+    is exact on the sample, optimality is only per batch).
+
+    Returns the solution in the solve_team schema with a "scenarios" block: per candidate its
+    expected and CVaR points, and for the chosen plan the mean, CVaR and percentiles.
+    """
+    if objective not in ("expected", "cvar"):
+        raise ValueError(f"Unknown scenario objective: {objective}")
+    t0 = time.perf_counter()
+    points = sample_scenarios(req, n, seed, spread, dnf)
+
+    # Expected value: mean points per rider and race
+    # float64: means of the float32 samples would carry float32 noise into the reported points
+    mean = points.mean(axis=0, dtype=np.float64)
+    mean_req = req.model_copy(update={"riders": [
+        r.model_copy(update={"expected_points": {c.id: float(mean[i, j]) for j, c in enumerate(req.races) if mean[i, j]}})
+        for i, r in enumerate(req.riders)
+    ]})
+    candidates = []
+    expected = solve_team(mean_req, backend=backend, time_limit=time_limit)
+    if "error" not in expected:
+        candidates.append(("expected", expected))
+
+    if objective == "cvar":
+        batches = [points[lo:lo + batch_size] for lo in range(0, n, batch_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_solve_batch, req, batch, alpha, time_limit, backend) for batch in batches]
+            for b, future in enumerate(futures):
+                solution = future.result()
+                if solution is not None:
+                    candidates.append((f"batch {b}", solution))
+
+    if not candidates:
+        return {"status": "Not Solved", "error": "Could not find optimal solution"}
+
+    scored = []
+    for name, solution in candidates:
+        totals = scenario_totals(req, solution, points)
+        scored.append((name, solution, totals, float(totals.mean()), cvar(totals, alpha)))
+    key = (lambda c: c[3]) if objective == "expected" else (lambda c: c[4])
+    name, solution, totals, mean_points, cvar_points = max(scored, key=key)
+
+    # Report the realised points of the chosen plan, not the mean-model objective
+    solution = build_solution(mean_req, {r.id: [r.id] for r in req.riders},
+                              [{m: 1 for m in race["team"]} for race in solution["races"]],
+                              [{m: 1 for m in race["selected"]} for race in solution["races"]])
+    # A sum of per-race means: drop the float summation noise (e.g. 233.04999999999998)
+    solution["total_points"] = round(solution["total_points"], 6)
+    solution["scenarios"] = {
+        "n": n,
+        "objective": objective,
+        "alpha": alpha,
+        "chosen": name,
+        "expected": mean_points,
+        "cvar": cvar_points,
+        "percentiles": {str(q): float(np.percentile(totals, q)) for q in (5, 25, 50, 75, 95)},
+        "candidates": [{"name": c[0], "expected": c[3], "cvar": c[4]} for c in scored],
+        "wall_time": time.perf_counter() - t0,
+    }
+    return solution
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scenario-based (expected / CVaR) squad optimisation.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--budget", type=float, default=40)
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--alpha", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    req = load_request(args.db, budget=args.budget)
+    for objective in ("expected", "cvar"):
+        s = solve_scenarios(req, args.scenarios, objective, args.alpha, args.batch_size, workers=args.workers)
+        sc = s["scenarios"]
+        print(f"{objective:<8} chosen={sc['chosen']:<9} expected={sc['expected']:.1f} cvar{args.alpha:g}={sc['cvar']:.1f} "
+              f"p5={sc['percentiles']['5']:.0f} p50={sc['percentiles']['50']:.0f} wall={sc['wall_time']:.1f}s")
+        for c in sc["candidates"]:
+            print(f"    {c['name']:<9} expected={c['expected']:.1f} cvar={c['cvar']:.1f}")
@@ -0,0 +1,101 @@
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from solver import SolverRequest, load_request, solve_team
+
+def _solve_chain(req: SolverRequest, budget: float, transfer_grid):
+    """
+    Solves one budget for increasing max_transfers. Every solution stays feasible when one
+    more transfer is allowed, so it warm-starts the next grid point.
+    """
+    results = []
+    incumbent = None
+    for max_transfers in transfer_grid:
+        point_req = req.model_copy(update={"budget": budget, "max_transfers": max_transfers})
+        t0 = time.perf_counter()
+        solution = solve_team(point_req, incumbent=incumbent)
+        solve_time = time.perf_counter() - t0
+        if "error" not in solution:
+            incumbent = solution
+        results.append({
+            "budget": budget,
+            "max_transfers": max_transfers,
+            "status": solution["status"],
+            "total_points": solution.get("total_points"),
+            "solve_time": solve_time,
+            "solution": solution if "error" not in solution else None,
+        })
+    return results
+
+def pareto_frontier(points):
+    """Grid points no other point beats with at most the same budget and transfers."""
+    solved = [p for p in points if p["total_points"] is not None]
+    frontier = []
+    for p in solved:
+        dominated = any(
+            q is not p
+            and q["budget"] <= p["budget"] and q["max_transfers"] <= p["max_transfers"]
+            and q["total_points"] >= p["total_points"]
+            and (q["budget"], q["max_transfers"], q["total_points"]) != (p["budget"], p["max_transfers"], p["total_points"])
+            for q in solved
+        )
+        if not dominated:
+            frontier.append(p)
+    return sorted(frontier, key=lambda p: (p["budget"], p["max_transfers"]))
+
+def pareto_sweep(req: SolverRequest, budgets=range(35, 46), transfers=range(0, 9), workers=None, keep_solutions=False):
+    """
+    Solves every (budget, max_transfers) grid point over a process pool. The transfer axis of
+    each budget is cut into as many warm-started chains (see _solve_chain) as it takes to give
+    every worker a task: whole axes when there are no more workers than budgets, single grid
+    points once there are as many workers as points. Shorter chains trade warm starts for
+    parallelism. Returns all grid points with their solve times and the Pareto frontier.
+    """
+    transfers = sorted(transfers)
+    budgets = list(budgets)
+    workers = workers or os.cpu_count() or 1
+    segments = min(len(transfers), math.ceil(workers / max(1, len(budgets))))
+    size = math.ceil(len(transfers) / max(1, segments))
+    chains = [(float(b), transfers[i:i + size]) for b in budgets for i in range(0, len(transfers), size)]
+    t0 = time.perf_counter()
+    points = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Longest chains and highest transfer counts (the slowest solves) first
+        chains.sort(key=lambda chain: (len(chain[1]), chain[1][-1]), reverse=True)
+        futures = [pool.submit(_solve_chain, req, budget, grid) for budget, grid in chains]
+        for future in as_completed(futures):
+            points.extend(future.result())
+    points.sort(key=lambda p: (p["budget"], p["max_transfers"]))
+
+    frontier = pareto_frontier(points)
+    if not keep_solutions:
+        for p in points:
+            p.pop("solution")
+    return {
+        "points": points,
+        "frontier": frontier,
+        "wall_time": time.perf_counter() - t0,
+        "solve_time": sum(p["solve_time"] for p in points),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Budget / max_transfers Pareto sweep over a process pool.")
+    parser.add_argument("--db", default="../webapp/api/pcs_data_v3.json")
+    parser.add_argument("--budgets", default="35:45", help="Inclusive range lo:hi (step 1)")
+    parser.add_argument("--transfers", default="0:8", help="Inclusive range lo:hi")
+    parser.add_argument("--workers", default="", help="Comma separated worker counts to compare, e.g. 1,2,4")
+    args = parser.parse_args()
+
+    lo, hi = (int(x) for x in args.budgets.split(":"))
+    budgets = range(lo, hi + 1)
+    lo, hi = (int(x) for x in args.transfers.split(":"))
+    transfer_grid = range(lo, hi + 1)
+    req = load_request(args.db)
+
+    for workers in ([int(w) for w in args.workers.split(",")] if args.workers else [os.cpu_count()]):
+        result = pareto_sweep(req, budgets, transfer_grid, workers=workers)
+        print(f"{workers} workers: wall {result['wall_time']:.1f}s, summed solve time {result['solve_time']:.1f}s")
+    for p in result["frontier"]:
+        print(f"  budget={p['budget']:<5} transfers={p['max_transfers']} points={p['total_points']} ({p['solve_time']:.2f}s)")
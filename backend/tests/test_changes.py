@@ -0,0 +1,89 @@
+import copy
+import json
+import random
+import pytest
+from snapshot import TRACKED_FIELDS, SnapshotStore, write_database
+
+def tracked(x, kind):
+    return {f: x.get(f) for f in TRACKED_FIELDS[kind]}
+
+def edit(rng, data, used):
+    """One random producer run: changed prices, ranks and results, renamed, added and removed entities."""
+    data = copy.deepcopy(data)
+    riders, races = data["riders"], data["races"]
+    action = rng.choice(["price", "ranks", "name", "add", "remove", "result", "none"])
+    if action == "price" and riders:
+        rng.choice(riders)["sporza_price"] = rng.choice([None, 4, 6, 9.5])
+    elif action == "ranks" and riders:
+        rng.choice(riders)["top_ranks"] = {c["id"]: rng.randint(1, 30) for c in rng.sample(races, 2)}
+    elif action == "name" and riders:
+        rng.choice(riders)["name"] = f"renamed {rng.random()}"  # not tracked
+    elif action == "add":
+        # Half of the time an id that was removed before (of the `used` ones) comes back
+        removed = sorted(used - {r["id"] for r in riders})
+        rider_id = rng.choice(removed) if removed and rng.random() < 0.5 else f"rider-{len(used)}"
+        used.add(rider_id)
+        riders.insert(rng.randrange(len(riders) + 1), {"id": rider_id, "name": "new", "sporza_price": 5, "top_ranks": {}})
+    elif action == "remove" and riders:
+        riders.pop(rng.randrange(len(riders)))
+    elif action == "result":
+        race = rng.choice(races)
+        race["is_completed"] = True
+        race["actual_results"] = {r["id"]: {"rank": k + 1, "points": 50 - k} for k, r in enumerate(riders[:3])}
+    return data
+
+@pytest.mark.parametrize("seed", range(5))
+def test_changes_since_matches_history(tmp_path, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / "db.json")
+    data = {
+        "riders": [{"id": f"rider-{i}", "name": f"R{i}", "sporza_price": 5, "top_ranks": {}} for i in range(15)],
+        "races": [{"id": f"race-{j}", "name": f"Race {j}", "is_completed": False} for j in range(5)],
+    }
+    # versions[v] = (riders, races) as written at data version v; a file without a version is version 0
+    with open(path, "w") as f:
+        json.dump(data, f)
+    versions = [copy.deepcopy(data)]
+    used = {r["id"] for r in data["riders"]}
+    for _ in range(40):
+        data = edit(rng, data, used)
+        version = write_database(data, path)
+        if data["riders"] == versions[-1]["riders"] and data["races"] == versions[-1]["races"]:
+            assert version == len(versions) - 1
+        else:
+            assert version == len(versions)
+            versions.append(copy.deepcopy(data))
+
+    snap = SnapshotStore(path).get()
+    assert snap.version == len(versions) - 1
+    assert snap.riders == data["riders"] and snap.races == data["races"]
+    for since in range(snap.version + 1):
+        delta = snap.changes_since(since)
+        assert (delta["version"], delta["since"]) == (snap.version, since)
+        for kind in TRACKED_FIELDS:
+            def changed(x, v):
+                prev = {y["id"]: y for y in versions[v - 1][kind]}.get(x["id"])
+                return prev is None or tracked(prev, kind) != tracked(x, kind)
+            stamped = {x["id"] for v in range(max(1, since + 1), snap.version + 1) for x in versions[v][kind] if changed(x, v)}
+            current = versions[-1][kind]
+            assert delta[kind] == [x for x in current if x["id"] in stamped], (kind, since)
+            now = {x["id"] for x in current}
+            gone = {x["id"] for v in range(since, snap.version + 1) for x in versions[v][kind]} - now
+            assert delta["removed"][kind] == sorted(gone), (kind, since)
+    with pytest.raises(ValueError):
+        snap.changes_since(snap.version + 1)
+    with pytest.raises(ValueError):
+        snap.changes_since(-1)
+
+def test_unchanged_write_keeps_file(tmp_path):
+    path = str(tmp_path / "db.json")
+    data = {"riders": [{"id": "a", "sporza_price": 5}], "races": [{"id": "r", "name": "R", "is_completed": False}]}
+    assert write_database(data, path) == 1
+    with open(path, "rb") as f:
+        written = f.read()
+    assert write_database(copy.deepcopy(data), path) == 1
+    with open(path, "rb") as f:
+        assert f.read() == written
+    snap = SnapshotStore(path).get()
+    assert snap.changes_since(0)["riders"] == data["riders"]
+    assert snap.changes_since(1) == {"version": 1, "since": 1, "riders": [], "races": [], "removed": {"riders": [], "races": []}}
@@ -0,0 +1,66 @@
+import json
+import os
+import random
+import pytest
+from snapshot import COLUMNAR_MEDIA_TYPE, decode_columnar, dumps, encode_columnar, wants_columnar
+
+DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "webapp", "api", "pcs_data_v3.json")
+
+def round_trip(riders, race_ids=()):
+    """Riders through the columnar encoding and its JSON wire form."""
+    return decode_columnar(json.loads(dumps(encode_columnar(riders, race_ids))))
+
+def same_objects(decoded, riders):
+    """Equal values, fields in the order they first appear over all riders (see encode_columnar)."""
+    fields = list(dict.fromkeys(k for r in riders for k in r))
+    return decoded == riders and all(list(a) == [f for f in fields if f in a] for a in decoded)
+
+def test_shipped_riders_round_trip():
+    with open(DB, "r") as f:
+        data = json.load(f)
+    race_ids = [c["id"] for c in data["races"]]
+    doc = encode_columnar(data["riders"], race_ids)
+    assert doc["races"][:len(race_ids)] == race_ids
+    decoded = round_trip(data["riders"], race_ids)
+    assert decoded == data["riders"] and all(list(a) == list(b) for a, b in zip(decoded, data["riders"]))
+    # The point of the encoding: repeated strings and race ids are sent once
+    assert len(dumps(doc)) < len(dumps(data["riders"])) / 2
+
+def random_rider(rng, i, races):
+    """A rider with a random subset of fields (in one fixed order), some of them not fitting their encoding."""
+    pick = lambda options: options[rng.randrange(len(options))]
+    values = {
+        "id": f"rider-{i}",
+        "name": pick(["A", "Bé", "", None]),
+        "team": pick(["Team A", "Team B", "Équipe C", None, 3]),
+        "team_logo": pick(["a.png", "b.png", None]),
+        "global_score": pick([0, 12, 12.5, None]),
+        "starts": pick([[], rng.sample(races, 2), races, ["new-race"], [1, 2]]),
+        "top_ranks": pick([{}, {rng.choice(races): rng.randint(1, 40)}, {"new-race": 3, races[0]: 1}]),
+        "historic_results": pick([[], ["1st", "2nd"], ["2nd", "2nd", "DNF"], [None]]),
+        "expertises": pick([{}, {"cobbles": 80, "sprint": 61}, {"climb": 55}, {"sprint": None}]),
+        "sporza_price": pick([None, 4, 7.5]),
+    }
+    return {k: v for k, v in values.items() if k == "id" or rng.random() < 0.7}
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_riders_round_trip(seed):
+    rng = random.Random(seed)
+    races = [f"race-{j}" for j in range(6)]
+    riders = [random_rider(rng, i, races) for i in range(rng.randint(0, 40))]
+    assert same_objects(round_trip(riders, races[:4]), riders)
+    assert same_objects(round_trip(riders), riders)
+
+def test_unfit_values_fall_back_to_plain_columns():
+    riders = [{"id": "a", "team": "T", "expertises": {"x": 1}}, {"id": "b", "team": 5, "expertises": {"x": None}}]
+    doc = encode_columnar(riders)
+    assert dict(doc["fields"]) == {"id": "plain", "team": "plain", "expertises": "plain"}
+    assert same_objects(round_trip(riders), riders)
+
+def test_wants_columnar():
+    assert wants_columnar("columnar", "")
+    assert not wants_columnar("json", COLUMNAR_MEDIA_TYPE)
+    assert wants_columnar(None, f"{COLUMNAR_MEDIA_TYPE}, application/json")
+    assert not wants_columnar(None, "application/json")
+    with pytest.raises(ValueError):
+        wants_columnar("csv", "")
@@ -0,0 +1,96 @@
+import json
+import os
+import random
+import pytest
+from snapshot import RiderIndex
+
+DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "webapp", "api", "pcs_data_v3.json")
+
+@pytest.fixture(scope="module")
+def data():
+    with open(DB, "r") as f:
+        return json.load(f)
+
+@pytest.fixture(scope="module")
+def index(data):
+    return RiderIndex(data["riders"], data["races"], digest="0123456789abcdef")
+
+def brute_force(riders, q=None, team=None, max_budget=None, starting=None, sort="score_desc", race=None):
+    """The dashboard's filter and sort semantics, rider by rider (ties in database order)."""
+    term = q.lower() if q and q.strip() else None
+    price = lambda r: r.get("sporza_price") or 0
+    keys = {
+        "score_desc": lambda r: -(r.get("global_score") or 0),
+        "roi_desc": lambda r: -(r.get("roi") or 0),
+        "budget_desc": lambda r: -price(r),
+        "budget_asc": price,
+        "race_desc": lambda r: r.get("top_ranks", {}).get(race) or 999,
+    }
+    matches = [
+        r for r in riders
+        if (term is None or term in (r.get("name") or "").lower())
+        and (team is None or r.get("team") == team)
+        and (max_budget is None or price(r) <= max_budget)
+        and (starting is None or starting in r.get("starts", []))
+    ]
+    return sorted(matches, key=keys[sort])
+
+def all_pages(index, limit, **query):
+    """Every item of a query, following next_cursor, and the totals reported per page."""
+    items, totals, cursor = [], set(), None
+    while True:
+        page = index.query(limit=limit, cursor=cursor, **query)
+        assert len(page["items"]) <= limit
+        items += page["items"]
+        totals.add(page["total"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, totals
+
+def random_query(rng, riders, race_ids):
+    name = rng.choice(riders).get("name") or ""
+    j = rng.randrange(max(1, len(name)))
+    query = {
+        "q": rng.choice([None, None, "", " ", name[j:j + rng.randint(1, 4)].upper(), "zzq"]),
+        "team": rng.choice([None, None, None, rng.choice(riders).get("team"), "Unknown team"]),
+        "max_budget": rng.choice([None, None, 0, 5, 10.5, 20]),
+        "starting": rng.choice([None, None, rng.choice(race_ids)]),
+        "sort": rng.choice(["score_desc", "roi_desc", "budget_desc", "budget_asc", "race_desc"]),
+    }
+    if query["sort"] == "race_desc":
+        query["race"] = rng.choice(race_ids)
+    return query
+
+def test_query_matches_brute_force(data, index):
+    rng = random.Random(7)
+    race_ids = [c["id"] for c in data["races"]]
+    for _ in range(300):
+        query = random_query(rng, data["riders"], race_ids)
+        expected = brute_force(data["riders"], **query)
+        items, totals = all_pages(index, rng.choice([1, 7, 50, 500]), **query)
+        assert [r["id"] for r in items] == [r["id"] for r in expected], query
+        assert totals == {len(expected)}, query
+
+def test_query_rejects_bad_input(data, index):
+    race = data["races"][0]["id"]
+    for bad in ({"sort": "name"}, {"sort": "race_desc"}, {"sort": "race_desc", "race": "no-race"},
+                {"starting": "no-race"}, {"limit": 0}, {"limit": 501}, {"cursor": "not a cursor"}):
+        with pytest.raises(ValueError):
+            index.query(**bad)
+    # A cursor only continues the query (order) it came from
+    cursor = index.query(sort="budget_asc", limit=1)["next_cursor"]
+    with pytest.raises(ValueError):
+        index.query(sort="race_desc", race=race, cursor=cursor)
+    stale = RiderIndex(data["riders"], data["races"], digest="fedcba9876543210")
+    with pytest.raises(ValueError):
+        stale.query(sort="budget_asc", cursor=cursor)
+
+def test_lineup_is_best_ranked_starters(data, index):
+    riders = data["riders"]
+    squad = list(range(0, len(riders), 3))
+    for race in data["races"]:
+        c = race["id"]
+        ranked = lambda members: sorted((i for i in members if c in riders[i].get("starts", [])),
+                                        key=lambda i: (riders[i].get("top_ranks", {}).get(c, 999), i))
+        assert index.lineup(c) == [riders[i]["id"] for i in ranked(range(len(riders)))][:12]
+        assert index.lineup(c, squad) == [riders[i]["id"] for i in ranked(squad)][:12]
@@ -0,0 +1,67 @@
+import pulp
+import pytest
+from bench_solver_model import build_reference_model
+from instances import synthetic_request
+from milp_backends import available_backends
+from presolve import prune_riders
+from solver import TeamHistory, build_model, resolve_team, solve_team
+
+# Small enough for CBC in well under a second; 5 transfers make the fee rule bind
+@pytest.fixture(scope="module")
+def req():
+    return synthetic_request(40, 4, seed=3, budget=50, max_transfers=5)
+
+def solve_objective(prob):
+    prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=60))
+    assert pulp.LpStatus[prob.status] == "Optimal"
+    return pulp.value(prob.objective)
+
+@pytest.fixture(scope="module")
+def baseline(req):
+    """Optimum of the original formulation (bench_solver_model.build_reference_model)."""
+    return solve_objective(build_reference_model(req))
+
+def test_compact_model_matches_reference(req, baseline):
+    prob, _ = build_model(req)
+    assert solve_objective(prob) == pytest.approx(baseline)
+
+def test_pruned_model_matches_reference(req, baseline):
+    pruned = prune_riders(req)
+    prob, _ = build_model(pruned.req, pruned.multiplicity)
+    assert solve_objective(prob) == pytest.approx(baseline)
+
+def test_solve_team_matches_reference(req, baseline):
+    solution = solve_team(req)
+    assert solution["status"] == "Optimal"
+    assert solution["total_points"] == pytest.approx(baseline)
+    assert sum(len(race["transfers_in"]) for race in solution["races"]) <= req.max_transfers
+
+def test_lp_bound_brackets_reference(req, baseline):
+    solution = solve_team(req, lp_bound=True)
+    assert solution["total_points"] == pytest.approx(baseline)
+    assert solution["bound"] >= baseline - 1e-6
+    assert 0.0 <= solution["gap"] < 1.0
+
+@pytest.mark.skipif("highs" not in available_backends(), reason="highspy is not installed")
+def test_highs_matches_reference(req, baseline):
+    solution = solve_team(req, backend="highs")
+    assert solution["total_points"] == pytest.approx(baseline)
+
+def fielded(solution, done):
+    return [TeamHistory(race_id=race["race_id"], team=race["team"], selected=race["selected"]) for race in solution["races"][:done]]
+
+@pytest.mark.parametrize("done", [1, 2, 3])
+def test_resolve_team_keeps_optimal_plan(req, baseline, done):
+    # Fielding the optimal plan leaves the optimum reachable; pruning on the owned squad keeps it
+    history = fielded(solve_team(req), done)
+    assert resolve_team(req, history)["total_points"] == pytest.approx(baseline)
+    assert resolve_team(req, history, prune=False)["total_points"] == pytest.approx(baseline)
+
+def test_resolve_team_rejects_bad_history(req):
+    history = fielded(solve_team(req), 2)
+    outsider = next(r.id for r in req.riders if r.id not in history[1].team)
+    for bad in (history[1].model_copy(update={"team": history[1].team[:-1]}),
+                history[1].model_copy(update={"team": history[1].team[:-1] + history[1].team[:1]}),
+                history[1].model_copy(update={"selected": history[1].selected[:-1] + [outsider]})):
+        with pytest.raises(ValueError):
+            resolve_team(req, [history[0], bad])
@@ -0,0 +1,194 @@
+import heapq
+import time
+import numpy as np
+from pydantic import BaseModel
+from typing import List, Optional
+from scoring import SquadScorer
+from solver import SolverRequest
+
+# Incoming candidates per outgoing pair in the first double swap pass (see suggest_transfers)
+MAX_PAIR_CANDIDATES = 200
+
+class TransferRequest(BaseModel):
+    riders: List[str]  # the current squad
+    from_race: Optional[str] = None  # first race of the new squad; default: first race not completed
+    budget: float = 120.0
+    transfers_used: int = 0
+    max_transfers: Optional[int] = None  # default: SolverRequest.max_transfers
+    race_squad_size: int = 12
+    top_n: int = 10
+    doubles: bool = True
+
+def _fee(transfers_used, made):
+    """Fee owed once `made` more transfers are done: max(0, cumulative transfers - 3), as in build_model."""
+    return max(0, transfers_used + made - 3)
+
+def _order_stats(M, ranks):
+    """Per race, the given 1-based ranks of the values of M (members on axis -2), 0 where missing."""
+    S = -np.sort(-M, axis=-2)
+    zeros = np.zeros(S.shape[:-2] + S.shape[-1:])
+    return [S[..., k - 1, :] if 0 < k <= S.shape[-2] else zeros for k in ranks]
+
+def suggest_transfers(req: SolverRequest, squad: List[str], transfers_used: int = 0, top_n: int = 10,
+                      doubles: bool = True, deadline: float = 0.8):
+    """
+    Ranks the transfers for a fixed squad over req.races (the races still to come): every
+    feasible single swap exhaustively, and by branch and bound the double swaps that gain more
+    than the best single swap.
+
+    A swap is feasible when the incoming riders have a price, the new squad plus the transfer
+    fee fits req.budget and transfers_used + swaps stays within req.max_transfers. Gains are
+    exact: with the squad fixed, a race scores its top race_squad_size riders, so adding or
+    removing a rider only interacts with the k-th and (k+1)-th best values of that race.
+
+    The top-k score is submodular, so for an outgoing pair with rest A the gain of adding n1
+    and n2 is at most m(n1) + m(n2), the gains of adding each to A alone. Outgoing pairs are
+    visited by that bound and skipped once it cannot beat the current top_n. The bound is loose
+    for squads that are already near optimal; the double swap search then stops `deadline`
+    seconds after the call and "exhaustive" is False.
+
+    Raises ValueError when the squad is not req.team_size riders or top_n is below 1.
+    """
+    if len(squad) != req.team_size:
+        raise ValueError(f"A squad has {req.team_size} riders, got {len(squad)}")
+    if top_n < 1:
+        raise ValueError("top_n must be at least 1")
+    t0 = time.perf_counter()
+    scorer = SquadScorer.from_request(req)
+    P, price, k = scorer.points, np.array([r.price for r in req.riders], dtype=float), req.race_squad_size
+    S = scorer.index(squad)
+    T = len(S)
+    current = float(scorer.score(S[None, :], k)["total"][0])
+    cost = float(price[S].sum())
+
+    buyable = price > 0
+    buyable[S] = False
+    fits = lambda made: transfers_used + made <= req.max_transfers
+
+    # Single swaps: o leaves, n joins. Ties go to the swap leaving the most budget.
+    singles = []
+    evaluated = {"singles": 0, "doubles": 0}
+    if T and fits(1):
+        M = P[S]
+        kth, next_kth = _order_stats(M, (k, k + 1))
+        starter = M >= kth
+        thr = np.where(starter, next_kth, kth)
+        loss = np.where(starter, M - next_kth, 0.0).sum(axis=1)
+        gain = np.maximum(0.0, P[None, :, :] - thr[:, None, :]).sum(axis=2) - loss[:, None]
+        delta = price[None, :] - price[S][:, None]
+        ok = buyable[None, :] & (cost + delta + _fee(transfers_used, 1) <= req.budget)
+        evaluated["singles"] = int(ok.sum())
+        gain = np.where(ok, gain, -np.inf)
+        flat = np.lexsort((delta.ravel(), -gain.ravel()))[:top_n]
+        for o, n in zip(*np.unravel_index(flat, gain.shape)):
+            if np.isfinite(gain[o, n]):
+                singles.append((float(gain[o, n]), [int(S[o])], [int(n)]))
+
+    # Double swaps: a and b leave, n1 and n2 join
+    pairs = []
+    exhaustive = True
+    stop = t0 + deadline
+    if doubles and T >= 2 and fits(2):
+        out_pairs = [(a, b) for a in range(T) for b in range(a + 1, T)]
+        rest = np.array([[S[i] for i in range(T) if i not in (a, b)] for a, b in out_pairs], dtype=np.intp)
+        A = P[rest]  # (pairs, T - 2, races)
+        t, t2 = _order_stats(A, (k, k - 1))
+        base = -np.sort(-A, axis=1)[:, :k, :].sum(axis=(1, 2)) - current
+        marginal = np.empty((len(out_pairs), len(P)))  # gain of adding one rider to the rest, per pair
+        for lo in range(0, len(out_pairs), 16):
+            marginal[lo:lo + 16] = np.maximum(0.0, P[None, :, :] - t[lo:lo + 16, None, :]).sum(axis=2)
+        marginal[:, ~buyable] = -np.inf
+        bound = base + -np.sort(-marginal, axis=1)[:, :2].sum(axis=1)
+        spend = req.budget - _fee(transfers_used, 2) - price[rest].sum(axis=1)
+        heap = []  # min-heap of the best top_n: ((gain, budget left), out, in)
+        seen = set()  # (outgoing pair, n1, n2) already pushed, as the full re-search revisits candidates
+        # A double swap is only worth suggesting when it beats every single swap
+        floor = max(0.0, singles[0][0]) if singles else 0.0
+
+        def threshold():
+            return heap[0][0][0] if len(heap) >= top_n else floor
+
+        def search(p, limit):
+            """
+            Pairs of incoming riders for outgoing pair p that can still enter the top_n. Returns
+            False when `limit` cut candidates or the deadline stopped the search.
+            """
+            m = marginal[p]
+            cand = np.flatnonzero(np.isfinite(m) & (m + m.max() + base[p] > threshold()))
+            cand = cand[np.argsort(-m[cand], kind="stable")]
+            complete = limit is None or len(cand) <= limit
+            cand = cand[:limit]
+            a, b = out_pairs[p]
+            p2 = P[cand][None, :, :]
+            # Rows of n1 a block at a time, to bound memory on large pools
+            for lo in range(0, len(cand), 32):
+                if time.perf_counter() > stop:
+                    return False
+                rows = cand[lo:lo + 32]
+                if m[rows[0]] + m.max() + base[p] <= threshold():
+                    break
+                # Exact gain of adding n1 then n2: n1 moves the k-th best up to max(t, min(p1, t2))
+                p1 = P[rows][:, None, :]
+                g = (np.maximum(0.0, p1 - t[p]) + np.maximum(0.0, p2 - np.maximum(t[p], np.minimum(p1, t2[p])))).sum(axis=2) + base[p]
+                left = spend[p] - price[rows][:, None] - price[cand][None, :]
+                ok = (np.arange(lo, lo + len(rows))[:, None] < np.arange(len(cand))[None, :]) & (left >= 0)
+                evaluated["doubles"] += int(ok.sum())
+                g = np.where(ok, g, -np.inf)
+                for i, j in zip(*np.unravel_index(np.argsort(-g, axis=None, kind="stable")[:top_n], g.shape)):
+                    if g[i, j] <= threshold():
+                        break
+                    key = (p, int(rows[i]), int(cand[j]))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    item = ((float(g[i, j]), float(left[i, j])), [int(S[a]), int(S[b])], [int(rows[i]), int(cand[j])])
+                    if len(heap) < top_n:
+                        heapq.heappush(heap, item)
+                    else:
+                        heapq.heappushpop(heap, item)
+            return complete
+
+        # Best bound first with a candidate cap, so the threshold rises quickly; outgoing pairs
+        # whose candidates were cut are searched again in full against the final threshold
+        capped = []
+        for p in np.argsort(-bound, kind="stable"):
+            if bound[p] <= threshold():
+                break
+            if time.perf_counter() > stop:
+                exhaustive = False
+                break
+            if not search(p, MAX_PAIR_CANDIDATES):
+                capped.append(p)
+        for p in capped:
+            if bound[p] > threshold() and not search(p, None):
+                exhaustive = False
+        pairs = [(key[0], out, inn) for key, out, inn in sorted(heap, reverse=True)]
+
+    def describe(swaps, made):
+        if not swaps:
+            return []
+        # Score the new squads with the scorer itself, so the reported points do not rely on the closed forms
+        squads = np.array([[inn[out.index(r)] if r in out else r for r in S] for _, out, inn in swaps], dtype=np.intp)
+        totals = scorer.score(squads, k)["total"]
+        fee = _fee(transfers_used, made)
+        return [
+            {
+                "out": [scorer.rider_ids[r] for r in out],
+                "in": [scorer.rider_ids[r] for r in inn],
+                "gain": float(total - current),
+                "total_points": float(total),
+                "fees_paid": fee,
+                "remaining_budget": req.budget - float(price[squad_row].sum()) - fee,
+            }
+            for (_, out, inn), total, squad_row in zip(swaps, totals, squads)
+        ]
+
+    return {
+        "races": scorer.race_ids,
+        "current_points": current,
+        "singles": describe(singles, 1),
+        "doubles": describe(pairs, 2),
+        "evaluated": evaluated,
+        "exhaustive": exhaustive,
+        "elapsed": time.perf_counter() - t0,
+    }
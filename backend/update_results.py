@@ -2,6 +2,7 @@ import cloudscraper
 from bs4 import BeautifulSoup
 import json
 import time
+from snapshot import write_database
 
 def get_sporza_points(rank):
     # Standard Sporza classification points (1st to 20th)
@@ -78,9 +79,8 @@ def update_results():
         time.sleep(0.5)
 
     if updated_races > 0:
-        with open(db_file, "w") as f:
-            json.dump(data, f, indent=2)
-        print(f"Successfully updated {updated_races} races with live completed results!")
+        version = write_database(data, db_file)
+        print(f"Successfully updated {updated_races} races with live completed results! (data version {version})")
     else:
         print("No races have completed results yet. Database unchanged.")
 
@@ -0,0 +1,122 @@
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from pydantic import BaseModel
+from typing import List, Optional
+import os
+import sys
+
+# The FastAPI app behind index.py, which imports it on the first request it cannot answer
+# from the prebuilt payloads (a leading underscore keeps Vercel from routing this file).
+# _snapshot.py is a copy of backend/snapshot.py
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _snapshot import COLUMNAR_MEDIA_TYPE, DEFAULT_PAGE_SIZE, Payload, SnapshotStore, dumps, encode_columnar, wants_columnar
+
+app = FastAPI(title="Wielermanager Optimization API v3")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Loaded once per version of the file; see SnapshotStore. index.py replaces it with its own
+# store, so both paths serve the same snapshot and prebuilt payloads
+DATA = SnapshotStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "pcs_data_v3.json"))
+
+def payload_response(payload, request: Request):
+    """A pre-rendered Payload as a response: 304 when the client's ETag matches, precompressed when accepted."""
+    status, body, headers = payload.render(request.headers.get("if-none-match", ""), request.headers.get("accept-encoding", ""))
+    return Response(body, status_code=status, headers=headers, media_type=payload.media_type)
+
+@app.get("/api/riders")
+def get_riders(request: Request, q: Optional[str] = None, team: Optional[str] = None, max_budget: Optional[float] = None,
+               starting: Optional[str] = None, sort: Optional[str] = None, race: Optional[str] = None,
+               limit: Optional[int] = None, cursor: Optional[str] = None, wire_format: Optional[str] = Query(None, alias="format")):
+    """
+    Without parameters: every rider. With any of them: one page of {"items", "total", "next_cursor"}
+    filtered by name (q), team, max_budget and the race a rider is `starting`, ordered by `sort`
+    (score_desc by default; race_desc ranks for `race`). Pass next_cursor back as `cursor` for
+    the next page.
+
+    format=columnar (or Accept: COLUMNAR_MEDIA_TYPE) encodes the riders column by column, see
+    encode_columnar.
+    """
+    snap = DATA.get()
+    try:
+        columnar = wants_columnar(wire_format, request.headers.get("accept", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type = COLUMNAR_MEDIA_TYPE if columnar else "application/json"
+    race_ids = [c["id"] for c in snap.races]
+    params = (q, team, max_budget, starting, sort, race, limit, cursor)
+    if all(p is None for p in params):
+        return payload_response(snap.riders_payload(columnar), request)
+    try:
+        page = snap.rider_index().query(q, team, max_budget, starting, sort or "score_desc", race,
+                                        DEFAULT_PAGE_SIZE if limit is None else limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if columnar:
+        page["items"] = encode_columnar(page["items"], race_ids)
+    return payload_response(Payload(dumps(page), media_type, "Accept, Accept-Encoding"), request)
+
+@app.get("/api/races")
+def get_races(request: Request):
+    snap = DATA.get()
+    return payload_response(snap.races_payload(), request)
+
+@app.get("/api/changes")
+def get_changes(request: Request, since: int):
+    """
+    Races whose results changed and riders whose price or ranks changed after data version
+    `since` (from X-Data-Version or an earlier call), plus removed ids; see Snapshot.changes_since.
+    """
+    snap = DATA.get()
+    try:
+        payload = snap.payload(("changes", since), lambda: dumps(snap.changes_since(since)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return payload_response(payload, request)
+
+def squad_solution(snap, squad=None):
+    """
+    Returns the ultimate 30-man squad (which is pre-calculated by the scraper), or the given
+    squad of rider ids. For each race, selects the top 12 riders of the squad that start it,
+    based strictly on their specific Top Competitor rank in that race (see RiderIndex.lineup).
+    """
+    RIDERS_DB, RACES_DB = snap.riders, snap.races
+    if not RIDERS_DB:
+        return {"error": "No rider data available"}
+    index = snap.rider_index()
+
+    if squad is None:
+        squad_ids = [r['id'] for r in RIDERS_DB] # Exactly the top 30
+        members = None
+    else:
+        squad_ids = list(dict.fromkeys(squad))
+        members = [index.positions[r] for r in squad_ids]
+    total_score = sum(RIDERS_DB[index.positions[r]].get('global_score', 0) for r in squad_ids)
+
+    return {
+        "status": "Optimal",
+        "total_points": total_score,
+        "squad_riders": squad_ids,
+        "races": [{"race_id": race['id'], "selected": index.lineup(race['id'], members)} for race in RACES_DB],
+    }
+
+class SquadRequest(BaseModel):
+    riders: List[str]
+
+@app.post("/api/solve")
+def solve_endpoint(req: Optional[SquadRequest] = None):
+    snap = DATA.get()
+    if req is None:
+        # Only depends on the data: computed and serialised once per snapshot
+        return Response(snap.cached("solve", lambda: dumps(squad_solution(snap))), media_type="application/json")
+    if snap.riders:
+        unknown = [r for r in req.riders if r not in snap.rider_index().positions]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown riders: {', '.join(unknown)}")
+    return squad_solution(snap, req.riders)
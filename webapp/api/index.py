@@ -1,84 +1,75 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import json
+import os
+import sys
 
-app = FastAPI(title="Wielermanager Optimization API v3")
+# Helpers live next to this file (a leading underscore keeps Vercel from routing them);
+# _snapshot.py is a copy of backend/snapshot.py
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+from _snapshot import COLUMNAR_MEDIA_TYPE, SnapshotStore, artefact_path_for
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+DB_FILE = os.path.join(HERE, "pcs_data_v3.json")
 
-import os
+# Importing FastAPI is ~90% of a cold start. The full riders and races lists, the bulk of the
+# traffic, are answered from the prebuilt artefact (see write_artefact) by this bare ASGI app;
+# the FastAPI app in _app.py is only imported for the first request that needs it.
+# WIELERMANAGER_FAST_START=0 serves everything from FastAPI, imported eagerly, as before.
+FAST_START = os.environ.get("WIELERMANAGER_FAST_START", "1") != "0"
+
+DATA = SnapshotStore(DB_FILE, artefact_path_for(DB_FILE) if FAST_START else None)
+
+_fastapi_app = None
 
-def load_data():
-    try:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        with open(os.path.join(base_dir, "pcs_data_v3.json"), "r") as f:
-            data = json.load(f)
-            return data.get("riders", []), data.get("races", [])
-    except Exception as e:
-        print("Warning: Could not load pcs_data_v3.json.", e)
-        return [], []
+def fastapi_app():
+    global _fastapi_app
+    if _fastapi_app is None:
+        import _app
+        _app.DATA = DATA  # one store for both paths
+        _fastapi_app = _app.app
+    return _fastapi_app
 
-@app.get("/api/riders")
-def get_riders():
-    RIDERS_DB, _ = load_data()
-    return RIDERS_DB
+def fast_payload(scope, headers):
+    """The prebuilt payload answering this request exactly as _app.py would, or None."""
+    if scope["method"] != "GET":
+        return None
+    path, query = scope["path"], scope["query_string"]
+    if path == "/api/races" and not query:
+        key = "races"
+    elif path == "/api/riders" and query in (b"", b"format=json", b"format=columnar"):
+        columnar = query == b"format=columnar" or (not query and COLUMNAR_MEDIA_TYPE in headers.get("accept", ""))
+        key = "riders_columnar" if columnar else "riders"
+    else:
+        return None
+    payloads = DATA.prebuilt()
+    return payloads.get(key) if payloads else None
 
-@app.get("/api/races")
-def get_races():
-    _, RACES_DB = load_data()
-    return RACES_DB
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            await send({"type": message["type"] + ".complete"})
+            if message["type"] == "lifespan.shutdown":
+                return
+    if scope["type"] == "http":
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        payload = fast_payload(scope, headers)
+        if payload is not None:
+            status, body, out = payload.render(headers.get("if-none-match", ""), headers.get("accept-encoding", ""))
+            # The headers FastAPI's Response and CORSMiddleware (allow_origins=["*"]) would add
+            if status == 200:
+                out["content-length"] = str(len(body))
+            out["content-type"] = payload.media_type
+            if "origin" in headers:
+                out["access-control-allow-origin"] = "*"
+            out["Vary"] = f"{out['Vary']}, Origin"
+            await send({"type": "http.response.start", "status": status,
+                        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in out.items()]})
+            await send({"type": "http.response.body", "body": body})
+            return
+    await fastapi_app()(scope, receive, send)
 
-@app.post("/api/solve")
-def solve_endpoint():
-    """
-    Returns the ultimate 30-man squad (which is pre-calculated by the scraper).
-    For each race, selects the top 12 available riders from the 30-man squad
-    based strictly on their specific Top Competitor rank in that race.
-    """
-    RIDERS_DB, RACES_DB = load_data()
-    if not RIDERS_DB:
-        return {"error": "No rider data available"}
-        
-    squad_ids = [r['id'] for r in RIDERS_DB] # Exactly the top 30
-    total_score = sum(r.get('global_score', 0) for r in RIDERS_DB)
-    
-    solution = {
-        "status": "Optimal",
-        "total_points": total_score,
-        "squad_riders": squad_ids,
-        "races": []
-    }
-    
-    for race in RACES_DB:
-        race_id = race['id']
-        
-        # 1. Filter the 30-man squad to riders who actually start this race
-        starters = [r for r in RIDERS_DB if race_id in r.get('starts', [])]
-        
-        # 2. Sort by their top_ranks for this specific race
-        # Lowest rank number is best. If they aren't explicitly ranked on top_competitors, give them 999.
-        def get_rank(rider):
-            ranks = rider.get('top_ranks', {})
-            return ranks.get(race_id, 999)
-            
-        starters.sort(key=get_rank)
-        
-        # 3. Take top 12
-        selected_riders = [r['id'] for r in starters[:12]]
-        
-        solution["races"].append({
-            "race_id": race_id,
-            "selected": selected_riders,
-        })
-        
-    return solution
+if not FAST_START:
+    app = fastapi_app()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("index:app", host="0.0.0.0", port=8000, reload=True)
@@ -3,9 +3,14 @@ import { Trophy, User, TrendingUp, Loader2, X, BarChart3, Medal, LogOut, Plus, U
 import { Routes, Route, useNavigate, Navigate } from 'react-router-dom';
 import { GoogleLogin } from '@react-oauth/google';
 import { jwtDecode } from "jwt-decode";
+import { decodeColumnar } from './columnar';
+import { mergeById, mergeList, type DataChanges } from './changes';
 import './index.css';
 
+const API_BASE = import.meta.env.PROD ? '' : 'http://localhost:8000';
 
+// How often an open dashboard asks /api/changes for newer data (when the tab is visible)
+const REFRESH_INTERVAL_MS = 5 * 60 * 1000;
 
 interface Rider {
   id: string;
@@ -226,6 +231,8 @@ function Dashboard() {
   const [ridersList, setRidersList] = useState<Rider[]>([]); // ALL riders sorted by score
   const [racesMeta, setRacesMeta] = useState<Record<string, RacesMetadata>>({});
   const [racesList, setRacesList] = useState<RacesMetadata[]>([]);
+  // Data version of the loaded riders and races: the `since` refreshData passes to /api/changes
+  const dataVersion = React.useRef<number | null>(null);
 
   // Team Modeling State
   const [teams, setTeams] = useState<CustomTeam[]>([{ id: 'default', name: 'My Simulator Team', riders: [] }]);
@@ -246,12 +253,19 @@ function Dashboard() {
     async function fetchData() {
       try {
         setLoading(true);
-        const API_BASE = import.meta.env.PROD ? '' : 'http://localhost:8000';
 
         // Fetch the raw database of everyone
         const [ridersRes, racesRes] = await Promise.all([
-          fetch(`${API_BASE}/api/riders`).then(r => r.json()),
-          fetch(`${API_BASE}/api/races`).then(r => r.json())
+          // Columnar encoding: a fraction of the bytes and faster to parse than the row objects.
+          // Production builds load the static copies written at build time (static-api.ts)
+          fetch(import.meta.env.VITE_STATIC_RIDERS_COLUMNAR ?? `${API_BASE}/api/riders?format=columnar`)
+            .then(r => {
+              // Static files carry it in the build (see static-api.ts), API responses in a header
+              dataVersion.current = Number(import.meta.env.VITE_STATIC_DATA_VERSION ?? r.headers.get('X-Data-Version') ?? 0);
+              return r.json();
+            })
+            .then(doc => decodeColumnar<Rider>(doc)),
+          fetch(import.meta.env.VITE_STATIC_RACES ?? `${API_BASE}/api/races`).then(r => r.json())
         ]);
 
         const rMeta: Record<string, Rider> = {};
@@ -286,6 +300,35 @@ function Dashboard() {
     fetchData();
   }, []);
 
+  // Mid-season refresh: only the races and riders that changed since the loaded data version
+  React.useEffect(() => {
+    let lastCheck = Date.now();
+    async function refreshData() {
+      const since = dataVersion.current;
+      if (since === null || document.visibilityState !== 'visible' || Date.now() - lastCheck < REFRESH_INTERVAL_MS) return;
+      lastCheck = Date.now();
+      try {
+        const res = await fetch(`${API_BASE}/api/changes?since=${since}`);
+        if (!res.ok) return;
+        const delta: DataChanges<Rider, RacesMetadata> = await res.json();
+        if (delta.version <= since || dataVersion.current !== since) return;
+        dataVersion.current = delta.version;
+        setRidersList(list => mergeList(list, delta.riders, delta.removed.riders).sort((a, b) => b.global_score - a.global_score));
+        setRidersMeta(byId => mergeById(byId, delta.riders, delta.removed.riders));
+        setRacesList(list => mergeList(list, delta.races, delta.removed.races));
+        setRacesMeta(byId => mergeById(byId, delta.races, delta.removed.races));
+      } catch {
+        // Keep the loaded data; the next check tries again
+      }
+    }
+    const timer = setInterval(refreshData, REFRESH_INTERVAL_MS);
+    document.addEventListener('visibilitychange', refreshData);
+    return () => {
+      clearInterval(timer);
+      document.removeEventListener('visibilitychange', refreshData);
+    };
+  }, []);
+
   const handleLogout = () => {
     localStorage.removeItem("google_user");
     setUser(null);
@@ -0,0 +1,26 @@
+// Merging the delta of /api/changes?since=<version> (Snapshot.changes_since in
+// backend/snapshot.py) into the riders and races the dashboard already holds.
+
+export interface DataChanges<R, C> {
+  version: number;
+  since: number;
+  riders: R[];
+  races: C[];
+  removed: { riders: string[]; races: string[] };
+}
+
+// The list with changed rows replaced in place, new rows appended and removed ids dropped
+export function mergeList<T extends { id: string }>(list: T[], changed: T[], removed: string[]): T[] {
+  const updates = new Map(changed.map(x => [x.id, x]));
+  const gone = new Set(removed);
+  const merged = list.filter(x => !gone.has(x.id)).map(x => updates.get(x.id) ?? x);
+  const known = new Set(list.map(x => x.id));
+  return merged.concat(changed.filter(x => !known.has(x.id) && !gone.has(x.id)));
+}
+
+export function mergeById<T extends { id: string }>(byId: Record<string, T>, changed: T[], removed: string[]): Record<string, T> {
+  const next = { ...byId };
+  removed.forEach(id => delete next[id]);
+  changed.forEach(x => next[x.id] = x);
+  return next;
+}
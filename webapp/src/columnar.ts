@@ -0,0 +1,56 @@
+// Decoder for the columnar rider encoding of /api/riders?format=columnar
+// (encode_columnar in backend/snapshot.py).
+
+export const COLUMNAR_MEDIA_TYPE = 'application/vnd.wielermanager.columnar+json';
+
+type Encoding = 'plain' | 'dict' | 'dict_list' | 'race_list' | 'race_map' | 'map_columns';
+
+export interface ColumnarDoc {
+  format: 'columnar';
+  count: number;
+  fields: [string, Encoding][];
+  races: string[];
+  dictionaries: Record<string, unknown[]>;
+  columns: Record<string, unknown>;
+  absent: Record<string, number[]>;
+}
+
+export function decodeColumnar<T>(doc: ColumnarDoc): T[] {
+  const rows: Record<string, unknown>[] = Array.from({ length: doc.count }, () => ({}));
+  for (const [field, encoding] of doc.fields) {
+    const skip = new Set(doc.absent[field] || []);
+    const dictionary = doc.dictionaries[field];
+    if (encoding === 'map_columns') {
+      const columns = Object.entries(doc.columns[field] as Record<string, unknown[]>);
+      rows.forEach((row, i) => {
+        if (skip.has(i)) return;
+        const value: Record<string, unknown> = {};
+        for (const [key, values] of columns) {
+          if (values[i] !== null) value[key] = values[i];
+        }
+        row[field] = value;
+      });
+      continue;
+    }
+    const column = doc.columns[field] as unknown[];
+    rows.forEach((row, i) => {
+      if (skip.has(i)) return;
+      const cell = column[i];
+      if (encoding === 'dict') {
+        row[field] = dictionary[cell as number];
+      } else if (encoding === 'dict_list') {
+        row[field] = (cell as number[]).map(x => dictionary[x]);
+      } else if (encoding === 'race_list') {
+        row[field] = (cell as number[]).map(j => doc.races[j]);
+      } else if (encoding === 'race_map') {
+        const pairs = cell as number[];
+        const value: Record<string, number> = {};
+        for (let k = 0; k < pairs.length; k += 2) value[doc.races[pairs[k]]] = pairs[k + 1];
+        row[field] = value;
+      } else {
+        row[field] = cell;
+      }
+    });
+  }
+  return rows as T[];
+}
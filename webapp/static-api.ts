@@ -0,0 +1,86 @@
+// Build step that writes the full /api/riders and /api/races responses into the build output as
+// static, content-hashed files, so the dashboard loads them from the CDN instead of the Python
+// function. The bytes come from the prebuilt artefact the function itself serves (write_artefact
+// in backend/snapshot.py), so both are identical; backend/check_static_payloads.py verifies that.
+import { createHash } from 'node:crypto';
+import { readFileSync } from 'node:fs';
+import path from 'node:path';
+import type { Plugin } from 'vite';
+
+// Artefact payload key -> file name stem; the files are data/<stem>.v<data version>.<tag>.json
+// (+ .gz, .br), the data version being the X-Data-Version the API sends with the same bytes
+export const STATIC_PAYLOADS: Record<string, string> = {
+  riders: 'riders',
+  riders_columnar: 'riders-columnar',
+  races: 'races',
+};
+
+const SUFFIXES: Record<string, string> = { identity: '', gzip: '.gz', br: '.br' };
+
+interface ArtefactPayload {
+  tag: string;
+  parts: Record<string, [number, number]>;
+}
+
+interface Artefact {
+  version: number;
+  payloads: Record<string, { tag: string; parts: Record<string, Buffer> }>;
+}
+
+// The data version and payload bodies (by key and encoding) of the artefact next to the data
+// file. Throws when the artefact was not built from the current data file.
+export function readArtefact(apiDir: string, db = 'pcs_data_v3.json'): Artefact {
+  const data = readFileSync(path.join(apiDir, db));
+  const artefactPath = path.join(apiDir, db.replace(/\.json$/, '.artefact'));
+  const artefact = readFileSync(artefactPath);
+  const newline = artefact.indexOf(0x0a);
+  const header = JSON.parse(artefact.subarray(0, newline).toString('utf8'));
+  if (header.source !== createHash('sha256').update(data).digest('hex')) {
+    throw new Error(`${artefactPath} is stale; rebuild it with: cd backend && python snapshot.py`);
+  }
+  const body = artefact.subarray(newline + 1);
+  const payloads: Artefact['payloads'] = {};
+  for (const [key, meta] of Object.entries(header.payloads as Record<string, ArtefactPayload>)) {
+    const parts: Record<string, Buffer> = {};
+    for (const [coding, [offset, length]] of Object.entries(meta.parts)) {
+      parts[coding] = body.subarray(offset, offset + length);
+    }
+    payloads[key] = { tag: meta.tag, parts };
+  }
+  return { version: header.version, payloads };
+}
+
+export function staticFileName(key: string, version: number, tag: string): string {
+  return `data/${STATIC_PAYLOADS[key]}.v${version}.${tag.slice(0, 16)}.json`;
+}
+
+// Exposes the URLs to the app as import.meta.env.VITE_STATIC_<KEY> (e.g. VITE_STATIC_RIDERS_COLUMNAR)
+// and their data version, the `since` for /api/changes, as import.meta.env.VITE_STATIC_DATA_VERSION;
+// they are undefined in the dev server, where the app calls the API instead.
+export function staticApi(apiDir = 'api'): Plugin {
+  let artefact: Artefact;
+  return {
+    name: 'static-api',
+    apply: 'build',
+    config(config) {
+      artefact = readArtefact(path.resolve(config.root ?? '', apiDir));
+      const define: Record<string, string> = {
+        'import.meta.env.VITE_STATIC_DATA_VERSION': JSON.stringify(String(artefact.version)),
+      };
+      for (const [key, { tag }] of Object.entries(artefact.payloads)) {
+        if (key in STATIC_PAYLOADS) {
+          define[`import.meta.env.VITE_STATIC_${key.toUpperCase()}`] = JSON.stringify(`/${staticFileName(key, artefact.version, tag)}`);
+        }
+      }
+      return { define };
+    },
+    generateBundle() {
+      for (const [key, { tag, parts }] of Object.entries(artefact.payloads)) {
+        if (!(key in STATIC_PAYLOADS)) continue;
+        for (const [coding, source] of Object.entries(parts)) {
+          this.emitFile({ type: 'asset', fileName: staticFileName(key, artefact.version, tag) + SUFFIXES[coding], source });
+        }
+      }
+    },
+  };
+}